@@ -0,0 +1,318 @@
+import argparse
+import multiprocessing
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import cache
+
+from engine import (
+    DIRECTIONS,
+    ROW_MASK,
+    BitboardEngine,
+    count_empty,
+    move_board,
+    transpose,
+)
+
+LOST_PENALTY = 200000.0
+MONOTONICITY_POWER = 4.0
+MONOTONICITY_WEIGHT = 47.0
+SUM_POWER = 3.5
+SUM_WEIGHT = 11.0
+MERGES_WEIGHT = 700.0
+EMPTY_WEIGHT = 270.0
+
+DEFAULT_TABLE_SIZE = 200_000
+DEFAULT_PROB_THRESHOLD = 0.0001
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class TranspositionTable:
+    def __init__(self, maxsize: int = DEFAULT_TABLE_SIZE):
+        self.maxsize = maxsize
+        self.entries: OrderedDict[int, tuple[int, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, board: int, depth: int) -> float | None:
+        entry = self.entries.get(board)
+        if entry is None or entry[0] < depth:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(board)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, board: int, depth: int, value: float) -> None:
+        self.entries[board] = (depth, value)
+        self.entries.move_to_end(board)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+def _row_heuristic(row: int) -> float:
+    line = [(row >> (4 * i)) & 0xF for i in range(4)]
+    total = 0.0
+    empty = 0
+    merges = 0
+    prev = 0
+    counter = 0
+    for rank in line:
+        total += rank**SUM_POWER
+        if rank == 0:
+            empty += 1
+        else:
+            if prev == rank:
+                counter += 1
+            elif counter > 0:
+                merges += 1 + counter
+                counter = 0
+            prev = rank
+    if counter > 0:
+        merges += 1 + counter
+
+    monotonicity_left = 0.0
+    monotonicity_right = 0.0
+    for i in range(1, 4):
+        a = line[i - 1] ** MONOTONICITY_POWER
+        b = line[i] ** MONOTONICITY_POWER
+        if line[i - 1] > line[i]:
+            monotonicity_left += a - b
+        else:
+            monotonicity_right += b - a
+
+    return (
+        LOST_PENALTY
+        + EMPTY_WEIGHT * empty
+        + MERGES_WEIGHT * merges
+        - MONOTONICITY_WEIGHT * min(monotonicity_left, monotonicity_right)
+        - SUM_WEIGHT * total
+    )
+
+
+@cache
+def heuristic_table() -> list[float]:
+    return [_row_heuristic(row) for row in range(65536)]
+
+
+def score_board(board: int) -> float:
+    table = heuristic_table()
+    columns = transpose(board)
+    return (
+        table[board & ROW_MASK]
+        + table[(board >> 16) & ROW_MASK]
+        + table[(board >> 32) & ROW_MASK]
+        + table[(board >> 48) & ROW_MASK]
+        + table[columns & ROW_MASK]
+        + table[(columns >> 16) & ROW_MASK]
+        + table[(columns >> 32) & ROW_MASK]
+        + table[(columns >> 48) & ROW_MASK]
+    )
+
+
+def search_depth(board: int) -> int:
+    distinct = {(board >> (4 * i)) & 0xF for i in range(16)} - {0}
+    return max(2, len(distinct) - 2)
+
+
+class _Search:
+    def __init__(
+        self,
+        table: TranspositionTable,
+        prob_threshold: float,
+        deadline: float | None,
+    ):
+        self.table = table
+        self.prob_threshold = prob_threshold
+        self.deadline = deadline
+        self.nodes = 0
+
+    def chance(self, board: int, depth: int, probability: float) -> float:
+        if depth <= 0 or probability < self.prob_threshold:
+            return score_board(board)
+
+        cached = self.table.get(board, depth)
+        if cached is not None:
+            return cached
+
+        self.nodes += 1
+        if self.deadline is not None and self.nodes & 0xFF == 0:
+            if time.monotonic() > self.deadline:
+                raise SearchTimeout()
+
+        empty = count_empty(board)
+        probability /= empty
+        total = 0.0
+        for index in range(16):
+            shift = 4 * index
+            if (board >> shift) & 0xF:
+                continue
+            total += 0.9 * self.best(board | (1 << shift), depth, probability * 0.9)
+            total += 0.1 * self.best(board | (2 << shift), depth, probability * 0.1)
+        value = total / empty
+
+        self.table.put(board, depth, value)
+        return value
+
+    def best(self, board: int, depth: int, probability: float) -> float:
+        best = 0.0
+        for direction in DIRECTIONS:
+            moved, _ = move_board(board, direction)
+            if moved != board:
+                best = max(best, self.chance(moved, depth - 1, probability))
+        return best
+
+
+_worker_table: TranspositionTable | None = None
+
+
+def _init_worker(table_size: int) -> None:
+    global _worker_table
+    _worker_table = TranspositionTable(table_size)
+    heuristic_table()
+
+
+def evaluate_move(
+    board: int,
+    direction: str,
+    depth: int,
+    prob_threshold: float = DEFAULT_PROB_THRESHOLD,
+    deadline: float | None = None,
+) -> float | None:
+    global _worker_table
+    if _worker_table is None:
+        _worker_table = TranspositionTable()
+    moved, _ = move_board(board, direction)
+    if moved == board:
+        return None
+    search = _Search(_worker_table, prob_threshold, deadline)
+    return search.chance(moved, depth - 1, 1.0)
+
+
+class ExpectimaxSolver:
+    def __init__(
+        self,
+        max_depth: int | None = None,
+        time_budget: float | None = None,
+        workers: int | None = None,
+        table_size: int = DEFAULT_TABLE_SIZE,
+        prob_threshold: float = DEFAULT_PROB_THRESHOLD,
+    ):
+        self.max_depth = max_depth
+        self.time_budget = time_budget
+        self.prob_threshold = prob_threshold
+        self.pool = None
+        if workers != 0:
+            self.pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(table_size,),
+            )
+        else:
+            _init_worker(table_size)
+        self._background = None
+
+    def best_move(self, board: int) -> str | None:
+        deadline = None
+        if self.time_budget is not None:
+            deadline = time.monotonic() + self.time_budget
+        max_depth = self.max_depth or search_depth(board)
+
+        best = None
+        for depth in range(1, max_depth + 1):
+            try:
+                values = self._evaluate(board, depth, deadline if best else None)
+            except SearchTimeout:
+                break
+            candidates = [
+                (value, direction)
+                for value, direction in zip(values, DIRECTIONS)
+                if value is not None
+            ]
+            if not candidates:
+                return None
+            best = max(candidates)[1]
+        return best
+
+    def _evaluate(
+        self, board: int, depth: int, deadline: float | None
+    ) -> list[float | None]:
+        if self.pool is None:
+            return [
+                evaluate_move(board, d, depth, self.prob_threshold, deadline)
+                for d in DIRECTIONS
+            ]
+        futures = [
+            self.pool.submit(
+                evaluate_move, board, d, depth, self.prob_threshold, deadline
+            )
+            for d in DIRECTIONS
+        ]
+        return [future.result() for future in futures]
+
+    def submit(self, board: int) -> Future:
+        if self._background is None:
+            self._background = ThreadPoolExecutor(max_workers=1)
+        return self._background.submit(self.best_move, board)
+
+    def close(self) -> None:
+        if self._background is not None:
+            self._background.shutdown(wait=False, cancel_futures=True)
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def play_game(solver: ExpectimaxSolver, seed: int) -> tuple[int, int, int]:
+    engine = BitboardEngine(rng=random.Random(seed))
+    engine.reset()
+    moves = 0
+    while not engine.is_game_over():
+        direction = solver.best_move(engine.board)
+        if direction is None:
+            break
+        engine.move(direction)
+        engine.spawn()
+        moves += 1
+    return engine.max_tile(), engine.score, moves
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless expectimax self-play")
+    parser.add_argument("--games", type=int, default=1)
+    parser.add_argument("--depth", type=int, default=None)
+    parser.add_argument("--time-budget", type=float, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    solver = ExpectimaxSolver(
+        max_depth=args.depth, time_budget=args.time_budget, workers=args.workers
+    )
+    start = time.perf_counter()
+    results = []
+    try:
+        for i in range(args.games):
+            max_tile, score, moves = play_game(solver, args.seed + i)
+            results.append((max_tile, score, moves))
+            print(f"game {i + 1}: max tile {max_tile}, score {score}, moves {moves}")
+    finally:
+        solver.close()
+    elapsed = time.perf_counter() - start
+
+    total_moves = sum(moves for _, _, moves in results)
+    print(f"games/sec: {len(results) / elapsed:.3f}")
+    print(f"moves/sec: {total_moves / elapsed:.1f}")
+    print(f"avg max tile: {sum(t for t, _, _ in results) / len(results):.1f}")
+    print(f"avg score: {sum(s for _, s, _ in results) / len(results):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import math
+
+from game import Tile, Turn
+
+SLIDE_DURATION = 0.1
+POP_DURATION = 0.12
+POP_SCALE = 0.2
+
+
+def ease_linear(t: float) -> float:
+    return t
+
+
+def ease_out_cubic(t: float) -> float:
+    return 1 - (1 - t) ** 3
+
+
+def ease_pop(t: float) -> float:
+    return 1 + POP_SCALE * math.sin(math.pi * t)
+
+
+class Animator:
+    def __init__(
+        self,
+        slide_duration: float = SLIDE_DURATION,
+        pop_duration: float = POP_DURATION,
+        easing=ease_out_cubic,
+    ):
+        self.slide_duration = slide_duration
+        self.pop_duration = pop_duration
+        self.easing = easing
+        self.slides: list[tuple[Tile, float, float, float, float]] = []
+        self.ghosts: list[Tile] = []
+        self.pops: list[Tile] = []
+        self.spawns: list[Tile] = []
+        self.start_time: float | None = None
+
+    @property
+    def active(self) -> bool:
+        return self.start_time is not None
+
+    def start(self, turn: Turn, now: float) -> None:
+        self.finish()
+        for tile, from_x, from_y in turn.slides:
+            self.slides.append((tile, from_x, from_y, tile.x, tile.y))
+            tile.x = from_x
+            tile.y = from_y
+        self.ghosts = [consumed for _, consumed in turn.merges]
+        self.pops = [keeper for keeper, _ in turn.merges]
+        if turn.spawned is not None:
+            turn.spawned.scale = 0.0
+            self.spawns.append(turn.spawned)
+        self.start_time = now
+
+    def update(self, now: float) -> bool:
+        if self.start_time is None:
+            return False
+
+        elapsed = now - self.start_time
+        progress = self.easing(min(1.0, elapsed / self.slide_duration))
+        for tile, from_x, from_y, to_x, to_y in self.slides:
+            tile.x = from_x + (to_x - from_x) * progress
+            tile.y = from_y + (to_y - from_y) * progress
+
+        if elapsed < self.slide_duration:
+            return True
+
+        self.ghosts = []
+        pop_elapsed = elapsed - self.slide_duration
+        if pop_elapsed >= self.pop_duration:
+            self.finish()
+            return False
+
+        t = pop_elapsed / self.pop_duration
+        for tile in self.pops:
+            tile.scale = ease_pop(t)
+        for tile in self.spawns:
+            tile.scale = ease_out_cubic(t)
+        return True
+
+    def finish(self) -> None:
+        for tile, _, _, to_x, to_y in self.slides:
+            tile.x = to_x
+            tile.y = to_y
+        for tile in self.pops + self.spawns:
+            tile.scale = 1.0
+        self.slides = []
+        self.ghosts = []
+        self.pops = []
+        self.spawns = []
+        self.start_time = None
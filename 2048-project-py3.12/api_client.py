@@ -0,0 +1,208 @@
+import json
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_URL = os.environ.get("GAME_API_URL", "http://127.0.0.1:8000")
+CONNECT_TIMEOUT = float(os.environ.get("GAME_API_CONNECT_TIMEOUT", "2"))
+READ_TIMEOUT = float(os.environ.get("GAME_API_READ_TIMEOUT", "5"))
+RETRIES = int(os.environ.get("GAME_API_RETRIES", "2"))
+BACKOFF = float(os.environ.get("GAME_API_BACKOFF", "0.3"))
+STREAM_READ_TIMEOUT = 40.0
+STREAM_RETRY = 3.0
+
+
+@dataclass
+class ApiResponse:
+    status: int | None
+    data: Any = None
+    error: str | None = None
+    headers: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200
+
+
+@dataclass
+class ServerEvent:
+    name: str
+    data: Any
+    id: str | None = None
+
+
+class EventStream:
+    def __init__(
+        self,
+        url: str,
+        deliver: Callable[[ServerEvent], None],
+        connect_timeout: float = CONNECT_TIMEOUT,
+        last_event_id: str | None = None,
+        retry: float = STREAM_RETRY,
+    ):
+        self.url = url
+        self.deliver = deliver
+        self.timeout = (connect_timeout, STREAM_READ_TIMEOUT)
+        self.last_event_id = last_event_id
+        self.retry = retry
+        self.closed = threading.Event()
+        self.response = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self) -> None:
+        while not self.closed.is_set():
+            headers = {"Accept": "text/event-stream"}
+            if self.last_event_id is not None:
+                headers["Last-Event-ID"] = self.last_event_id
+            try:
+                with requests.get(
+                    self.url, headers=headers, stream=True, timeout=self.timeout
+                ) as response:
+                    self.response = response
+                    if response.status_code == 200:
+                        self.read(response)
+            except Exception:
+                pass
+            self.response = None
+            self.closed.wait(self.retry)
+
+    def read(self, response: requests.Response) -> None:
+        name, event_id, data = "message", None, []
+        for line in response.iter_lines(decode_unicode=True):
+            if self.closed.is_set():
+                return
+            if not line:
+                if data:
+                    if event_id is not None:
+                        self.last_event_id = event_id
+                    self.deliver(
+                        ServerEvent(name, json.loads("\n".join(data)), event_id)
+                    )
+                name, event_id, data = "message", None, []
+                continue
+            field, _, value = line.partition(":")
+            value = value.removeprefix(" ")
+            if field == "event":
+                name = value
+            elif field == "id":
+                event_id = value
+            elif field == "data":
+                data.append(value)
+
+    def close(self) -> None:
+        self.closed.set()
+        response = self.response
+        if response is not None:
+            response.close()
+
+
+class ApiClient:
+    def __init__(
+        self,
+        base_url: str = API_URL,
+        timeout: tuple[float, float] = (CONNECT_TIMEOUT, READ_TIMEOUT),
+        retries: int = RETRIES,
+        backoff: float = BACKOFF,
+        workers: int = 2,
+        on_result: Callable[[], None] | None = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.on_result = on_result
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=workers,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=backoff,
+                status_forcelist=(502, 503, 504),
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.results: queue.SimpleQueue = queue.SimpleQueue()
+        self.streams: set[EventStream] = set()
+
+    def get(
+        self,
+        path: str,
+        callback: Callable[[ApiResponse], None],
+        params: dict | None = None,
+        headers: dict | None = None,
+    ) -> None:
+        self._submit("GET", path, callback, params=params, headers=headers)
+
+    def post(
+        self,
+        path: str,
+        callback: Callable[[ApiResponse], None],
+        json: Any = None,
+    ) -> None:
+        self._submit("POST", path, callback, json=json)
+
+    def stream(
+        self,
+        path: str,
+        callback: Callable[[ServerEvent], None],
+        last_event_id: str | None = None,
+    ) -> EventStream:
+        stream = EventStream(
+            self.base_url + path,
+            lambda event: self._deliver(callback, event),
+            self.timeout[0],
+            last_event_id,
+        )
+        self.streams.add(stream)
+        return stream
+
+    def close_stream(self, stream: EventStream) -> None:
+        self.streams.discard(stream)
+        stream.close()
+
+    def _submit(self, method: str, path: str, callback, **kwargs) -> None:
+        future = self.executor.submit(self.request, method, path, **kwargs)
+        future.add_done_callback(lambda f: self._deliver(callback, f.result()))
+
+    def _deliver(self, callback, response: ApiResponse | ServerEvent) -> None:
+        self.results.put((callback, response))
+        if self.on_result is not None:
+            self.on_result()
+
+    def request(self, method: str, path: str, **kwargs) -> ApiResponse:
+        try:
+            response = self.session.request(
+                method, self.base_url + path, timeout=self.timeout, **kwargs
+            )
+        except requests.RequestException as e:
+            return ApiResponse(None, error=str(e))
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        return ApiResponse(response.status_code, data, headers=response.headers)
+
+    def poll(self) -> int:
+        handled = 0
+        while True:
+            try:
+                callback, response = self.results.get_nowait()
+            except queue.Empty:
+                return handled
+            callback(response)
+            handled += 1
+
+    def close(self) -> None:
+        for stream in list(self.streams):
+            self.close_stream(stream)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
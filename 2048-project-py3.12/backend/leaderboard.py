@@ -0,0 +1,209 @@
+import asyncio
+import threading
+import time
+from bisect import bisect_left, insort
+from concurrent.futures import Future
+
+from metrics import Histogram
+from stats import ScoreStats
+from store import ScoreStore
+
+REFRESH_INTERVAL = 0.1
+STORE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+class Leaderboard:
+    def __init__(self, store: ScoreStore, refresh_interval: float = REFRESH_INTERVAL):
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self.rows: list[tuple[int, int, str]] = []
+        self.pending: list[tuple[list[tuple[str, int, str | None]], Future]] = []
+        self.keys: set[str] = set()
+        self.stats = ScoreStats()
+        self.watermark = 0
+        self.last_id = 0
+        self.modified = time.time()
+        self.local_ids: set[int] = set()
+        self.load_seconds = 0.0
+        self.save_seconds = Histogram(STORE_BUCKETS)
+        self.rows_written = 0
+        self.data_version: int | None = None
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopping = False
+        self.flusher = None
+
+    def load(self) -> None:
+        start = time.perf_counter()
+        loaded = self.store.load_all()
+        rows = [(-score, row_id, name) for row_id, name, score in loaded]
+        rows.sort()
+        stats = ScoreStats()
+        stats.extend([(name, score) for _, name, score in loaded])
+        del loaded
+        keys = self.store.load_keys()
+        with self.lock:
+            self.rows = rows
+            self.keys = keys
+            self.stats = stats
+            self.watermark = max((row_id for _, row_id, _ in rows), default=0)
+            self.last_id = self.watermark
+            self.modified = time.time()
+            self.local_ids = set()
+        self.data_version = None
+        self.load_seconds = time.perf_counter() - start
+
+    def start(self) -> None:
+        self.stopping = False
+        self.flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self.flusher.start()
+
+    def stop(self) -> None:
+        self.stopping = True
+        self.wakeup.set()
+        if self.flusher is not None:
+            self.flusher.join()
+            self.flusher = None
+        self.flush()
+
+    def best_score(self) -> int:
+        with self.lock:
+            return -self.rows[0][0] if self.rows else 0
+
+    @property
+    def version(self) -> str:
+        with self.lock:
+            return f"{len(self.rows)}-{self.last_id}"
+
+    def top(self, limit: int) -> tuple[list[tuple[int, int, str]], str]:
+        with self.lock:
+            return self.rows[:limit], f"{len(self.rows)}-{self.last_id}"
+
+    def page(
+        self, skip: int = 0, limit: int = 10, after: tuple[int, int] | None = None
+    ) -> tuple[list[dict], tuple[int, int] | None]:
+        with self.lock:
+            rows = self.rows
+            if after is not None:
+                skip += bisect_left(rows, (-after[0], after[1] + 1))
+            page = rows[skip : skip + limit]
+            more = skip + limit < len(rows)
+        entries = [{"name": name, "score": -score} for score, _, name in page]
+        if len(page) < limit or not more:
+            return entries, None
+        score, row_id, _ = page[-1]
+        return entries, (-score, row_id)
+
+    def rank(self, score: int) -> int:
+        with self.lock:
+            return bisect_left(self.rows, (-score,)) + 1
+
+    def percentile(self, score: int) -> tuple[float, int]:
+        with self.lock:
+            return self.stats.sketch.percentile(score), self.stats.sketch.count
+
+    def player(self, name: str) -> dict | None:
+        with self.lock:
+            return self.stats.player(name)
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.rows)
+
+    def enqueue(self, entries: list[tuple[str, int, str | None]]) -> Future:
+        future = Future()
+        with self.lock:
+            self.pending.append((entries, future))
+        self.wakeup.set()
+        return future
+
+    async def submit(self, name: str, score: int) -> dict:
+        await asyncio.wrap_future(self.enqueue([(name, score, None)]))
+        return {"name": name, "score": score}
+
+    async def submit_many(self, entries: list[tuple[str, str, int]]) -> int:
+        if not entries:
+            return 0
+        return await asyncio.wrap_future(
+            self.enqueue([(name, score, key) for key, name, score in entries])
+        )
+
+    def merge(self, rows: list[tuple[int, int, str]]) -> None:
+        if not rows:
+            return
+        self.last_id = max(self.last_id, max(row_id for _, row_id, _ in rows))
+        self.modified = time.time()
+        for score, _, name in rows:
+            self.stats.add(name, -score)
+        if len(rows) < 16:
+            for row in rows:
+                insort(self.rows, row)
+        else:
+            self.rows = sorted(self.rows + rows)
+
+    def flush(self) -> int:
+        with self.flush_lock:
+            with self.lock:
+                batch, self.pending = self.pending, []
+            if not batch:
+                return 0
+            entries = [entry for group, _ in batch for entry in group]
+            start = time.perf_counter()
+            try:
+                ids = self.store.insert_many(entries)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                raise
+            self.save_seconds.observe(time.perf_counter() - start)
+
+            rows = []
+            with self.lock:
+                for (name, score, key), row_id in zip(entries, ids):
+                    if row_id is None:
+                        continue
+                    rows.append((-score, row_id, name))
+                    self.local_ids.add(row_id)
+                    if key is not None:
+                        self.keys.add(key)
+                self.merge(rows)
+            self.rows_written += len(rows)
+
+            start = 0
+            for group, future in batch:
+                end = start + len(group)
+                future.set_result(sum(row_id is not None for row_id in ids[start:end]))
+                start = end
+            return len(rows)
+
+    def refresh(self) -> int:
+        version = self.store.data_version()
+        if version == self.data_version:
+            return 0
+        self.data_version = version
+        added = self.store.load_since(self.watermark)
+        if not added:
+            return 0
+        with self.lock:
+            rows = []
+            for row_id, name, score, key in added:
+                if row_id in self.local_ids:
+                    continue
+                rows.append((-score, row_id, name))
+                if key is not None:
+                    self.keys.add(key)
+            self.merge(rows)
+            self.watermark = max(row_id for row_id, _, _, _ in added)
+            self.local_ids = {i for i in self.local_ids if i > self.watermark}
+        return len(rows)
+
+    def _flush_loop(self) -> None:
+        while not self.stopping:
+            self.wakeup.wait(self.refresh_interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+                self.refresh()
+            except Exception as e:
+                print(f"Failed to sync scores: {e}")
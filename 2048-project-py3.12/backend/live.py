@@ -0,0 +1,137 @@
+import asyncio
+import json
+import signal
+import threading
+
+from leaderboard import Leaderboard
+
+TOP_N = 10
+TICK = 0.1
+HEARTBEAT = 15.0
+QUEUE_SIZE = 16
+
+
+def format_event(name: str, event_id: str, data) -> bytes:
+    return f"event: {name}\nid: {event_id}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+class LiveLeaderboard:
+    def __init__(
+        self,
+        leaderboard: Leaderboard,
+        top_n: int = TOP_N,
+        tick: float = TICK,
+        heartbeat: float = HEARTBEAT,
+    ):
+        self.leaderboard = leaderboard
+        self.top_n = top_n
+        self.tick = tick
+        self.heartbeat = heartbeat
+        self.subscribers: set[asyncio.Queue] = set()
+        self.top: list[tuple[int, int, str]] = []
+        self.version = None
+        self.task = None
+        self.closing = False
+        self.sent = 0
+
+    def start(self) -> None:
+        self.top, self.version = self.leaderboard.top(self.top_n)
+        self.task = asyncio.create_task(self._run())
+        self.closing = False
+        self.close_on_exit()
+
+    def close_on_exit(self) -> None:
+        if threading.current_thread() is not threading.main_thread():
+            return
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            previous = signal.getsignal(signum)
+            if not callable(previous):
+                continue
+
+            def handler(signum, frame, previous=previous):
+                loop.call_soon_threadsafe(self.close)
+                previous(signum, frame)
+
+            signal.signal(signum, handler)
+
+    def close(self) -> None:
+        self.closing = True
+        for queue in self.subscribers:
+            self.replace(queue, None)
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        self.close()
+
+    def snapshot(self) -> bytes:
+        entries = [{"name": name, "score": -score} for score, _, name in self.top]
+        return format_event("snapshot", self.version, entries)
+
+    def subscribe(self, last_event_id: str | None = None) -> asyncio.Queue:
+        queue = asyncio.Queue(QUEUE_SIZE)
+        if last_event_id != self.version:
+            queue.put_nowait(self.snapshot())
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self.subscribers.discard(queue)
+
+    def replace(self, queue: asyncio.Queue, message: bytes | None) -> None:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+    def publish(self, message: bytes) -> None:
+        snapshot = None
+        for queue in self.subscribers:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                if snapshot is None:
+                    snapshot = self.snapshot()
+                self.replace(queue, snapshot)
+        self.sent += len(self.subscribers)
+
+    def diff(self) -> bytes | None:
+        top, version = self.leaderboard.top(self.top_n)
+        if version == self.version:
+            return None
+        seen = {row_id for _, row_id, _ in self.top}
+        inserted = [
+            {"rank": rank, "name": name, "score": -score}
+            for rank, (score, row_id, name) in enumerate(top, 1)
+            if row_id not in seen
+        ]
+        self.top = top
+        self.version = version
+        if not inserted:
+            return None
+        return format_event("insert", version, {"inserted": inserted})
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick)
+            message = self.diff()
+            if message is not None and self.subscribers:
+                self.publish(message)
+
+    async def events(self, last_event_id: str | None = None):
+        if self.closing:
+            return
+        queue = self.subscribe(last_event_id)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            self.unsubscribe(queue)
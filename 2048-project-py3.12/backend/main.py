@@ -1,52 +1,254 @@
-from fastapi import FastAPI
-import json
-from pydantic import BaseModel
+import base64
+import binascii
 import os
+from contextlib import asynccontextmanager
+from email.utils import formatdate
 
-app = FastAPI()
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from leaderboard import Leaderboard
+from live import LiveLeaderboard
+from metrics import Metrics, MetricsMiddleware
+from pydantic import BaseModel, Field
+from store import ScoreStore
+from verifier import MAX_MOVES, ReplayVerifier
 
+DATABASE_FILE = "2048_game.db"
 LEADERBOARD_FILE = "leaderboard.json"
+REQUIRE_REPLAY = os.environ.get("REQUIRE_REPLAY", "1") != "0"
+METRICS_DIR = os.environ.get("METRICS_DIR", "metrics")
+
+store = ScoreStore(DATABASE_FILE)
+leaderboard = Leaderboard(store)
+live = LiveLeaderboard(leaderboard)
+verifier = ReplayVerifier()
+
+
+def worker_series() -> list[tuple[str, str, str, object]]:
+    return [
+        (
+            "store_save_seconds",
+            "histogram",
+            "Time to commit a batch of submitted scores.",
+            leaderboard.save_seconds,
+        ),
+        (
+            "store_rows_written_total",
+            "counter",
+            "Scores written to the store.",
+            leaderboard.rows_written,
+        ),
+        (
+            "replays_verified_total",
+            "counter",
+            "Replays that verified.",
+            verifier.verified,
+        ),
+        (
+            "replays_rejected_total",
+            "counter",
+            "Replays that failed verification.",
+            verifier.rejected,
+        ),
+        (
+            "leaderboard_stream_clients",
+            "gauge",
+            "Open leaderboard streams.",
+            len(live.subscribers),
+        ),
+    ]
+
+
+metrics = Metrics(METRICS_DIR or None, series=worker_series)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    migrated = store.migrate_json(LEADERBOARD_FILE)
+    if migrated:
+        print(f"Migrated {migrated} scores from {LEADERBOARD_FILE}")
+    leaderboard.load()
+    leaderboard.start()
+    verifier.start()
+    live.start()
+    metrics.start()
+    yield
+    metrics.stop()
+    await live.stop()
+    verifier.stop()
+    leaderboard.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+
+class Replay(BaseModel):
+    seed: int = Field(ge=0, lt=1 << 64)
+    moves: str
+    count: int = Field(ge=0, le=MAX_MOVES)
+    size: int = 4
 
 
 class ScoreSubmit(BaseModel):
     name: str
     score: int
+    replay: Replay | None = None
 
 
-def load_scores():
-    if not os.path.exists(LEADERBOARD_FILE):
-        return []
-    try:
-        with open(LEADERBOARD_FILE, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
+class QueuedScore(BaseModel):
+    id: str
+    name: str
+    score: int
+    replay: Replay | None = None
+
+
+class ScoreBatch(BaseModel):
+    scores: list[QueuedScore]
 
 
 @app.get("/get-best-score/")
-def get_best_score():
-    scores = load_scores()
-    if not scores:
-        return {"best_score": 0}
-    return {"best_score": scores[0]["score"]}
+async def get_best_score():
+    return {"best_score": leaderboard.best_score()}
 
 
-def save_scores(scores):
-    with open(LEADERBOARD_FILE, "w") as f:
-        json.dump(scores, f, indent=2)
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    gauges = [
+        ("leaderboard_scores", "gauge", "Scores in the leaderboard.", len(leaderboard)),
+        (
+            "store_load_seconds",
+            "gauge",
+            "Time to load the leaderboard from the store at startup.",
+            leaderboard.load_seconds,
+        ),
+        (
+            "store_disk_bytes",
+            "gauge",
+            "Size of the database and its write-ahead log.",
+            store.disk_bytes(),
+        ),
+    ]
+    return PlainTextResponse(
+        metrics.render(gauges), media_type="text/plain; version=0.0.4"
+    )
+
+
+def parse_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        score, row_id = cursor.split(".")
+        return int(score), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    if header is None:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
 
 
 @app.get("/get-leaderboard/")
-def get_leaderboard(skip: int = 0, limit: int = 10):
-    scores = load_scores()
-    return scores[skip : skip + limit]
+async def get_leaderboard(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: str | None = None,
+):
+    after = parse_cursor(cursor) if cursor is not None else None
+    headers = {
+        "ETag": f'W/"{leaderboard.version}"',
+        "Last-Modified": formatdate(leaderboard.modified, usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    entries, last = leaderboard.page(skip, limit, after)
+    if last is not None:
+        headers["Link"] = (
+            f'</get-leaderboard/?limit={limit}&cursor={last[0]}.{last[1]}>; rel="next"'
+        )
+    response.headers.update(headers)
+    return entries
+
+
+@app.get("/leaderboard-stream/")
+async def leaderboard_stream(last_event_id: str | None = Header(None)):
+    return StreamingResponse(
+        live.events(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@app.get("/rank/{score}")
+async def get_rank(score: int):
+    return {"score": score, "rank": leaderboard.rank(score), "total": len(leaderboard)}
+
+
+@app.get("/percentile/{score}")
+async def get_percentile(score: int):
+    percentile, total = leaderboard.percentile(score)
+    return {"score": score, "percentile": percentile, "total": total}
+
+
+@app.get("/players/{name}")
+async def get_player(name: str):
+    player = leaderboard.player(name)
+    if player is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+    return player
+
+
+async def check_replays(entries: list[ScoreSubmit | QueuedScore]) -> list[str | None]:
+    errors: list[str | None] = [None] * len(entries)
+    pending = []
+    for i, entry in enumerate(entries):
+        if entry.replay is None:
+            if REQUIRE_REPLAY:
+                errors[i] = "Score has no replay"
+            continue
+        if entry.replay.size != 4:
+            errors[i] = "Only 4x4 replays can be verified"
+            continue
+        try:
+            moves = base64.b64decode(entry.replay.moves, validate=True)
+        except binascii.Error:
+            errors[i] = "Replay moves are not valid base64"
+            continue
+        pending.append((i, (entry.replay.seed, moves, entry.replay.count, entry.score)))
+
+    results = await verifier.averify_many([replay for _, replay in pending])
+    for (i, _), error in zip(pending, results):
+        errors[i] = error
+    return errors
 
 
 @app.post("/submit-score/")
-def submit_score(score: ScoreSubmit):
-    scores = load_scores()
-    new_score = {"name": score.name, "score": score.score}
-    scores.append(new_score)
-    scores.sort(key=lambda x: x["score"], reverse=True)
-    save_scores(scores)
-    return new_score
+async def submit_score(score: ScoreSubmit):
+    error = (await check_replays([score]))[0]
+    if error is not None:
+        raise HTTPException(status_code=422, detail=error)
+    return await leaderboard.submit(score.name, score.score)
+
+
+@app.post("/submit-scores/")
+async def submit_scores(batch: ScoreBatch):
+    entries = [entry for entry in batch.scores if entry.id not in leaderboard.keys]
+    errors = await check_replays(entries)
+    accepted = await leaderboard.submit_many(
+        [
+            (entry.id, entry.name, entry.score)
+            for entry, error in zip(entries, errors)
+            if error is None
+        ]
+    )
+    rejected = sum(error is not None for error in errors)
+    return {
+        "accepted": accepted,
+        "duplicates": len(batch.scores) - accepted - rejected,
+        "rejected": rejected,
+    }
@@ -0,0 +1,274 @@
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+WRITE_INTERVAL = 1.0
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def to_list(self) -> list:
+        return [list(self.buckets), list(self.counts), self.sum]
+
+    def merge(self, data: list) -> None:
+        buckets, counts, total = data
+        if tuple(buckets) != self.buckets:
+            raise ValueError("Histogram buckets differ")
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.sum += total
+
+    def lines(self, name: str, labels: str = "") -> list[str]:
+        prefix = labels + "," if labels else ""
+        lines = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {total}')
+        total += self.counts[-1]
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {total}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.sum}")
+        lines.append(f"{name}_count{suffix} {total}")
+        return lines
+
+
+def label_text(**labels: str) -> str:
+    return ",".join(
+        '{}="{}"'.format(
+            key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for key, value in labels.items()
+    )
+
+
+class Metrics:
+    def __init__(
+        self,
+        directory: str | None = None,
+        series=None,
+        interval: float = WRITE_INTERVAL,
+    ):
+        self.requests: dict[tuple[str, str, int], int] = {}
+        self.errors: dict[tuple[str, str], int] = {}
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.directory = directory
+        self.series = series
+        self.interval = interval
+        self.path = None
+        self.wakeup = threading.Event()
+        self.writer = None
+
+    def record(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        streaming: bool = False,
+    ) -> None:
+        key = (method, route, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        if not streaming:
+            histogram = self.latency.get((method, route))
+            if histogram is None:
+                histogram = self.latency[(method, route)] = Histogram()
+            histogram.observe(seconds)
+        if status >= 500:
+            self.errors[(method, route)] = self.errors.get((method, route), 0) + 1
+
+    def start(self) -> None:
+        if self.directory is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"metrics-{os.getpid()}.json")
+        self.write()
+        self.wakeup.clear()
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+
+    def stop(self) -> None:
+        self.wakeup.set()
+        if self.writer is not None:
+            self.writer.join()
+            self.writer = None
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+    def snapshot(self) -> dict:
+        series = []
+        for name, kind, help_text, value in self.series() if self.series else ():
+            if kind == "histogram":
+                value = value.to_list()
+            series.append([name, kind, help_text, value])
+        return {
+            "requests": [[*key, count] for key, count in list(self.requests.items())],
+            "errors": [[*key, count] for key, count in list(self.errors.items())],
+            "latency": [
+                [*key, histogram.to_list()]
+                for key, histogram in list(self.latency.items())
+            ],
+            "series": series,
+        }
+
+    def write(self) -> None:
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.snapshot(), f, separators=(",", ":"))
+        os.replace(temp_path, self.path)
+
+    def _write_loop(self) -> None:
+        while not self.wakeup.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                print(f"Failed to write metrics: {e}")
+
+    def snapshots(self) -> list[dict]:
+        if self.path is None:
+            return [self.snapshot()]
+        self.write()
+        snapshots = []
+        stale = time.time() - 3 * self.interval
+        for path in glob.glob(os.path.join(self.directory, "metrics-*.json")):
+            try:
+                if os.path.getmtime(path) < stale:
+                    continue
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def render(self, gauges: list[tuple[str, str, str, object]] = ()) -> str:
+        requests: dict[tuple[str, str, int], int] = {}
+        errors: dict[tuple[str, str], int] = {}
+        latency: dict[tuple[str, str], Histogram] = {}
+        series: dict[str, list] = {}
+        for snapshot in self.snapshots():
+            for method, route, status, count in snapshot["requests"]:
+                key = (method, route, status)
+                requests[key] = requests.get(key, 0) + count
+            for method, route, count in snapshot["errors"]:
+                errors[(method, route)] = errors.get((method, route), 0) + count
+            for method, route, data in snapshot["latency"]:
+                histogram = latency.get((method, route))
+                if histogram is None:
+                    histogram = latency[(method, route)] = Histogram(tuple(data[0]))
+                histogram.merge(data)
+            for name, kind, help_text, value in snapshot["series"]:
+                if name not in series:
+                    if kind == "histogram":
+                        total = Histogram(tuple(value[0]))
+                    else:
+                        total = 0
+                    series[name] = [kind, help_text, total]
+                if kind == "histogram":
+                    series[name][2].merge(value)
+                else:
+                    series[name][2] += value
+
+        lines = [
+            "# HELP http_requests_total Requests handled, by route and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(requests.items()):
+            labels = label_text(method=method, route=route, status=str(status))
+            lines.append(f"http_requests_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP http_request_errors_total Requests that failed with a 5xx.",
+            "# TYPE http_request_errors_total counter",
+        ]
+        for (method, route), count in sorted(errors.items()):
+            labels = label_text(method=method, route=route)
+            lines.append(f"http_request_errors_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP http_request_duration_seconds Request latency, by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(latency.items()):
+            lines += histogram.lines(
+                "http_request_duration_seconds", label_text(method=method, route=route)
+            )
+
+        merged = [(name, *entry) for name, entry in series.items()]
+        for name, kind, help_text, value in merged + list(gauges):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            if kind == "histogram":
+                lines += value.lines(name)
+            else:
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        streaming = False
+
+        async def send_status(message) -> None:
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                streaming = any(
+                    key == b"content-type" and value.startswith(b"text/event-stream")
+                    for key, value in message.get("headers", ())
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_status)
+        except Exception:
+            status = 500
+            raise
+        finally:
+            route = scope.get("route")
+            self.metrics.record(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status,
+                time.perf_counter() - start,
+                streaming,
+            )
@@ -0,0 +1,116 @@
+import random
+from functools import cache
+
+ROW_MASK = 0xFFFF
+CELL_MASK = 0xF
+NUM_CELLS = 16
+DIRECTIONS = ("left", "right", "up", "down")
+
+
+def _slide_row_left(cells: list[int]) -> tuple[list[int], int]:
+    tiles = [c for c in cells if c]
+    result = []
+    score = 0
+    i = 0
+    while i < len(tiles):
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1] and tiles[i] < CELL_MASK:
+            exponent = tiles[i] + 1
+            result.append(exponent)
+            score += 1 << exponent
+            i += 2
+        else:
+            result.append(tiles[i])
+            i += 1
+    return result + [0] * (len(cells) - len(result)), score
+
+
+def _pack_row(cells: list[int]) -> int:
+    return cells[0] | cells[1] << 4 | cells[2] << 8 | cells[3] << 12
+
+
+def _unpack_row(row: int) -> list[int]:
+    return [row & 0xF, (row >> 4) & 0xF, (row >> 8) & 0xF, (row >> 12) & 0xF]
+
+
+@cache
+def row_tables() -> tuple[list[int], list[int], list[int]]:
+    left = [0] * 65536
+    right = [0] * 65536
+    score = [0] * 65536
+    for row in range(65536):
+        cells = _unpack_row(row)
+        moved, gained = _slide_row_left(cells)
+        left[row] = _pack_row(moved)
+        score[row] = gained
+        moved, _ = _slide_row_left(cells[::-1])
+        right[row] = _pack_row(moved[::-1])
+    return left, right, score
+
+
+def transpose(board: int) -> int:
+    a1 = board & 0xF0F00F0FF0F00F0F
+    a2 = board & 0x0000F0F00000F0F0
+    a3 = board & 0x0F0F00000F0F0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00FF0000FF00FF
+    b2 = a & 0x00FF00FF00000000
+    b3 = a & 0x00000000FF00FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def _move_rows(board: int, table: list[int], score: list[int]) -> tuple[int, int]:
+    r0 = board & ROW_MASK
+    r1 = (board >> 16) & ROW_MASK
+    r2 = (board >> 32) & ROW_MASK
+    r3 = (board >> 48) & ROW_MASK
+    new_board = table[r0] | table[r1] << 16 | table[r2] << 32 | table[r3] << 48
+    return new_board, score[r0] + score[r1] + score[r2] + score[r3]
+
+
+def move_board(board: int, direction: str) -> tuple[int, int]:
+    left, right, score = row_tables()
+    if direction == "left":
+        return _move_rows(board, left, score)
+    if direction == "right":
+        return _move_rows(board, right, score)
+    if direction == "up":
+        moved, gained = _move_rows(transpose(board), left, score)
+        return transpose(moved), gained
+    if direction == "down":
+        moved, gained = _move_rows(transpose(board), right, score)
+        return transpose(moved), gained
+    raise ValueError(f"Unknown direction: {direction}")
+
+
+def empty_cells(board: int) -> list[int]:
+    return [i for i in range(NUM_CELLS) if not (board >> (4 * i)) & CELL_MASK]
+
+
+class ReplayEngine:
+    def __init__(self, seed: int):
+        self.board = 0
+        self.score = 0
+        self.rng = random.Random(seed)
+        self.spawn()
+        self.spawn()
+
+    def move(self, direction: str) -> bool:
+        new_board, gained = move_board(self.board, direction)
+        if new_board == self.board:
+            return False
+        self.board = new_board
+        self.score += gained
+        return True
+
+    def spawn(self) -> None:
+        empty = empty_cells(self.board)
+        if empty:
+            index = self.rng.choice(empty)
+            exponent = 2 if self.rng.random() > 0.9 else 1
+            self.board |= exponent << (4 * index)
+
+
+def read_moves(data: bytes, count: int):
+    if not 0 <= count <= len(data) * 4:
+        raise ValueError(f"{len(data)} bytes cannot hold {count} moves")
+    return ((data[i >> 2] >> (2 * (i & 3))) & 3 for i in range(count))
@@ -0,0 +1,133 @@
+import math
+from collections import Counter
+
+RELATIVE_ACCURACY = 0.01
+SKETCH_BUCKETS = 2048
+RECENT_SCORES = 10
+
+
+class QuantileSketch:
+    def __init__(
+        self,
+        relative_accuracy: float = RELATIVE_ACCURACY,
+        buckets: int = SKETCH_BUCKETS,
+    ):
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(gamma)
+        self.buckets = buckets
+        self.tree = [0] * (buckets + 1)
+        self.zeros = 0
+        self.count = 0
+
+    def index(self, value: float) -> int:
+        return min(self.buckets, max(1, math.ceil(math.log(value) / self.log_gamma)))
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value <= 0:
+            self.zeros += 1
+            return
+        i = self.index(value)
+        while i <= self.buckets:
+            self.tree[i] += 1
+            i += i & -i
+
+    def extend(self, values: list[float]) -> None:
+        counts = [0] * (self.buckets + 1)
+        for value, count in Counter(values).items():
+            self.count += count
+            if value <= 0:
+                self.zeros += count
+            else:
+                counts[self.index(value)] += count
+        tree = self.tree
+        for i in range(1, self.buckets + 1):
+            tree[i] += counts[i]
+            parent = i + (i & -i)
+            if parent <= self.buckets:
+                counts[parent] += counts[i]
+
+    def prefix(self, i: int) -> int:
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def rank(self, value: float) -> float:
+        if value <= 0:
+            return 0.0
+        i = self.index(value)
+        below = self.prefix(i - 1)
+        return self.zeros + below + (self.prefix(i) - below) / 2
+
+    def percentile(self, value: float) -> float:
+        if not self.count:
+            return 0.0
+        return 100 * self.rank(value) / self.count
+
+
+class PlayerStats:
+    __slots__ = ("best", "games", "total", "recent")
+
+    def __init__(
+        self, best: int = 0, games: int = 0, total: int = 0, recent: tuple = ()
+    ):
+        self.best = best
+        self.games = games
+        self.total = total
+        self.recent: tuple[int, ...] = recent
+
+    def add(self, score: int) -> None:
+        self.best = max(self.best, score)
+        self.games += 1
+        self.total += score
+        self.recent = (self.recent + (score,))[-RECENT_SCORES:]
+
+    @classmethod
+    def from_scores(cls, scores: list[int]) -> "PlayerStats":
+        return cls(
+            max(scores), len(scores), sum(scores), tuple(scores[-RECENT_SCORES:])
+        )
+
+    def to_dict(self, name: str) -> dict:
+        return {
+            "name": name,
+            "best": self.best,
+            "games": self.games,
+            "average": self.total / self.games,
+            "recent": list(reversed(self.recent)),
+        }
+
+
+class ScoreStats:
+    def __init__(self):
+        self.players: dict[str, PlayerStats] = {}
+        self.sketch = QuantileSketch()
+
+    def add(self, name: str, score: int) -> None:
+        player = self.players.get(name)
+        if player is None:
+            player = self.players[name] = PlayerStats()
+        player.add(score)
+        self.sketch.add(score)
+
+    def extend(self, entries: list[tuple[str, int]]) -> None:
+        scores: dict[str, list[int]] = {}
+        for name, score in entries:
+            if name in scores:
+                scores[name].append(score)
+            else:
+                scores[name] = [score]
+        for name, history in scores.items():
+            player = self.players.get(name)
+            if player is None:
+                self.players[name] = PlayerStats.from_scores(history)
+            else:
+                for score in history:
+                    player.add(score)
+        self.sketch.extend([score for _, score in entries])
+
+    def player(self, name: str) -> dict | None:
+        player = self.players.get(name)
+        return player.to_dict(name) if player is not None else None
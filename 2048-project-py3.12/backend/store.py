@@ -0,0 +1,136 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER NOT NULL,
+    username VARCHAR,
+    score INTEGER,
+    timestamp DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    idempotency_key VARCHAR,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_scores_username ON scores (username);
+CREATE INDEX IF NOT EXISTS ix_scores_score ON scores (score DESC, id);
+"""
+
+
+class ScoreStore:
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        self.initialized = False
+        self.init_lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+            with self.init_lock:
+                if not self.initialized:
+                    self.init_schema(conn)
+                    self.initialized = True
+        return conn
+
+    def init_schema(self, conn: sqlite3.Connection) -> None:
+        with self.transaction(conn):
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(scores)")}
+            if "idempotency_key" not in columns:
+                conn.execute("ALTER TABLE scores ADD COLUMN idempotency_key VARCHAR")
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS ix_scores_idempotency_key"
+                " ON scores (idempotency_key)"
+            )
+
+    @contextmanager
+    def transaction(self, conn: sqlite3.Connection | None = None):
+        if conn is None:
+            conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def load_all(self) -> list[tuple[int, str, int]]:
+        return self.conn.execute(
+            "SELECT id, username, score FROM scores ORDER BY id"
+        ).fetchall()
+
+    def load_since(self, row_id: int) -> list[tuple[int, str, int, str | None]]:
+        return self.conn.execute(
+            "SELECT id, username, score, idempotency_key FROM scores"
+            " WHERE id > ? ORDER BY id",
+            (row_id,),
+        ).fetchall()
+
+    def load_keys(self) -> set[str]:
+        rows = self.conn.execute(
+            "SELECT idempotency_key FROM scores WHERE idempotency_key IS NOT NULL"
+        )
+        return {key for key, in rows}
+
+    def data_version(self) -> int:
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def insert_many(
+        self, entries: list[tuple[str, int, str | None]]
+    ) -> list[int | None]:
+        ids = []
+        with self.transaction() as conn:
+            for entry in entries:
+                row = conn.execute(
+                    "INSERT INTO scores (username, score, idempotency_key)"
+                    " VALUES (?, ?, ?) ON CONFLICT (idempotency_key) DO NOTHING"
+                    " RETURNING id",
+                    entry,
+                ).fetchone()
+                ids.append(row[0] if row else None)
+        return ids
+
+    def add_many(self, rows: list[tuple[int, str, int, str | None]]) -> None:
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO scores (id, username, score, idempotency_key)"
+                " VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def disk_bytes(self) -> int:
+        total = 0
+        for suffix in ("", "-wal"):
+            try:
+                total += os.path.getsize(self.path + suffix)
+            except OSError:
+                pass
+        return total
+
+    def migrate_json(self, path: str) -> int:
+        with self.transaction() as conn:
+            if not os.path.exists(path):
+                return 0
+            try:
+                with open(path, "r") as f:
+                    scores = json.load(f)
+            except json.JSONDecodeError:
+                return 0
+
+            scores.sort(key=lambda x: x["score"], reverse=True)
+            conn.executemany(
+                "INSERT INTO scores (username, score) VALUES (?, ?)",
+                [(entry["name"], entry["score"]) for entry in scores],
+            )
+            os.replace(path, path + ".migrated")
+        return len(scores)
@@ -0,0 +1,96 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from replay import DIRECTIONS, ReplayEngine, read_moves, row_tables
+
+CPU_BUDGET = float(os.environ.get("REPLAY_CPU_BUDGET", "0.5"))
+MAX_MOVES = 1 << 20
+CHECK_INTERVAL = 256
+
+
+def verify_replay(
+    seed: int, moves: bytes, count: int, score: int, cpu_budget: float = CPU_BUDGET
+) -> str | None:
+    row_tables()
+    deadline = time.thread_time() + cpu_budget
+    try:
+        log = read_moves(moves, count)
+    except ValueError as e:
+        return str(e)
+
+    engine = ReplayEngine(seed)
+    for i, move in enumerate(log):
+        if not engine.move(DIRECTIONS[move]):
+            return f"Move {i} does not change the board"
+        engine.spawn()
+        if i % CHECK_INTERVAL == 0 and time.thread_time() > deadline:
+            return "Replay exceeded its CPU budget"
+
+    if engine.score != score:
+        return f"Replay scores {engine.score}, not {score}"
+    return None
+
+
+class ReplayVerifier:
+    def __init__(self, workers: int | None = None, cpu_budget: float = CPU_BUDGET):
+        self.workers = workers
+        self.cpu_budget = cpu_budget
+        self.pool = None
+        self.lock = threading.Lock()
+        self.verified = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        if self.workers != 0:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=row_tables,
+            )
+
+    def stop(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    def verify_many(
+        self, replays: list[tuple[int, bytes, int, int]]
+    ) -> list[str | None]:
+        if self.pool is None:
+            results = [verify_replay(*r, self.cpu_budget) for r in replays]
+        else:
+            futures = [
+                self.pool.submit(verify_replay, *r, self.cpu_budget) for r in replays
+            ]
+            results = [future.result() for future in futures]
+        return self.count(results)
+
+    async def averify_many(
+        self, replays: list[tuple[int, bytes, int, int]]
+    ) -> list[str | None]:
+        if not replays:
+            return []
+        if self.pool is None:
+            return await asyncio.to_thread(self.verify_many, replays)
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(self.pool, verify_replay, *r, self.cpu_budget)
+                for r in replays
+            )
+        )
+        return self.count(results)
+
+    def count(self, results: list[str | None]) -> list[str | None]:
+        rejected = sum(result is not None for result in results)
+        with self.lock:
+            self.verified += len(results) - rejected
+            self.rejected += rejected
+        return results
+
+    def verify(self, seed: int, moves: bytes, count: int, score: int) -> str | None:
+        return self.verify_many([(seed, moves, count, score)])[0]
@@ -0,0 +1,138 @@
+from functools import cache
+
+import numpy as np
+
+from engine import CELL_MASK, DIRECTIONS, row_tables
+
+LEFT, RIGHT, UP, DOWN = range(4)
+GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+
+
+@cache
+def _numpy_tables() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    left, right, score = row_tables()
+    return (
+        np.array(left, dtype=np.uint16),
+        np.array(right, dtype=np.uint16),
+        np.array(score, dtype=np.int64),
+    )
+
+
+def _splitmix64(state: np.ndarray) -> np.ndarray:
+    z = state.copy()
+    z ^= z >> np.uint64(30)
+    z *= np.uint64(0xBF58476D1CE4E5B9)
+    z ^= z >> np.uint64(27)
+    z *= np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return z
+
+
+def _pack_rows(rows: np.ndarray) -> np.ndarray:
+    rows = rows.astype(np.uint16)
+    return rows[:, 0] | rows[:, 1] << 4 | rows[:, 2] << 8 | rows[:, 3] << 12
+
+
+def _unpack_rows(keys: np.ndarray) -> np.ndarray:
+    shifts = np.array([0, 4, 8, 12], dtype=np.uint16)
+    return ((keys[:, None] >> shifts) & 0xF).astype(np.uint8)
+
+
+def move_boards(boards: np.ndarray, direction: int) -> tuple[np.ndarray, np.ndarray]:
+    left, right, score = _numpy_tables()
+    if direction in (UP, DOWN):
+        boards = boards.transpose(0, 2, 1)
+    keys = _pack_rows(boards.reshape(-1, 4))
+    table = left if direction in (LEFT, UP) else right
+    moved = _unpack_rows(table[keys]).reshape(-1, 4, 4)
+    gained = score[keys].reshape(-1, 4).sum(axis=1)
+    if direction in (UP, DOWN):
+        moved = moved.transpose(0, 2, 1)
+    return np.ascontiguousarray(moved), gained
+
+
+def game_over_mask(boards: np.ndarray) -> np.ndarray:
+    has_empty = (boards == 0).any(axis=(1, 2))
+    mergeable = boards < CELL_MASK
+    horizontal = (boards[:, :, 1:] == boards[:, :, :-1]) & mergeable[:, :, 1:]
+    vertical = (boards[:, 1:, :] == boards[:, :-1, :]) & mergeable[:, 1:, :]
+    return ~(has_empty | horizontal.any(axis=(1, 2)) | vertical.any(axis=(1, 2)))
+
+
+class BatchGame:
+    def __init__(self, n: int, seed: int | None = None, seeds=None):
+        self.n = n
+        self.boards = np.zeros((n, 4, 4), dtype=np.uint8)
+        self.scores = np.zeros(n, dtype=np.int64)
+        if seeds is None:
+            seeds = np.random.SeedSequence(seed).generate_state(n, dtype=np.uint64)
+        self.rng_state = np.asarray(seeds, dtype=np.uint64).copy()
+        if self.rng_state.shape != (n,):
+            raise ValueError(f"Expected {n} seeds, got {self.rng_state.shape}")
+
+    def _random(self, mask: np.ndarray) -> np.ndarray:
+        self.rng_state[mask] += GOLDEN_GAMMA
+        return (_splitmix64(self.rng_state[mask]) >> np.uint64(11)) * (2.0**-53)
+
+    def reset(self, mask: np.ndarray | None = None) -> None:
+        if mask is None:
+            mask = np.ones(self.n, dtype=bool)
+        self.boards[mask] = 0
+        self.scores[mask] = 0
+        self.spawn(mask)
+        self.spawn(mask)
+
+    def spawn(self, mask: np.ndarray | None = None) -> np.ndarray:
+        if mask is None:
+            mask = np.ones(self.n, dtype=bool)
+        flat = self.boards.reshape(self.n, 16)
+        empty = flat == 0
+        mask = mask & empty.any(axis=1)
+        if not mask.any():
+            return mask
+
+        cell_draw = self._random(mask)
+        value_draw = self._random(mask)
+        empty = empty[mask]
+        counts = empty.sum(axis=1)
+        picks = (cell_draw * counts).astype(np.int64)
+        cells = (np.cumsum(empty, axis=1) > picks[:, None]).argmax(axis=1)
+        exponents = np.where(value_draw > 0.9, 2, 1).astype(np.uint8)
+        flat[np.flatnonzero(mask), cells] = exponents
+        return mask
+
+    def move(self, directions) -> tuple[np.ndarray, np.ndarray]:
+        directions = self._direction_indices(directions)
+        gained = np.zeros(self.n, dtype=np.int64)
+        changed = np.zeros(self.n, dtype=bool)
+        for direction in range(len(DIRECTIONS)):
+            mask = directions == direction
+            if not mask.any():
+                continue
+            before = self.boards[mask]
+            moved, score = move_boards(before, direction)
+            changed[mask] = (moved != before).any(axis=(1, 2))
+            gained[mask] = score
+            self.boards[mask] = moved
+        gained[~changed] = 0
+        self.scores += gained
+        return gained, changed
+
+    def step(self, directions) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        gained, changed = self.move(directions)
+        self.spawn(changed)
+        return gained, changed, self.game_over()
+
+    def game_over(self) -> np.ndarray:
+        return game_over_mask(self.boards)
+
+    def max_tiles(self) -> np.ndarray:
+        exponents = self.boards.max(axis=(1, 2)).astype(np.int64)
+        return np.where(exponents > 0, 1 << exponents, 0)
+
+    def _direction_indices(self, directions) -> np.ndarray:
+        directions = np.asarray(directions)
+        if directions.dtype.kind in "US":
+            lookup = {name: index for index, name in enumerate(DIRECTIONS)}
+            directions = np.array([lookup[str(d)] for d in directions.ravel()])
+        return np.broadcast_to(directions, (self.n,))
@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+SUITES = ("engine", "allocations", "render", "backend")
+
+
+def run_suites(names: list[str], seed: int, min_time: float) -> dict[str, dict]:
+    results = {}
+    for name in names:
+        print(f"Running {name} benchmarks...", file=sys.stderr)
+        if name == "engine":
+            from benchmarks import engine
+
+            results.update(engine.run(seed, min_time))
+        elif name == "allocations":
+            from benchmarks import allocations
+
+            results.update(allocations.run(seed, min_time))
+        elif name == "render":
+            from benchmarks import render
+
+            results.update(render.run(seed, min_time))
+        elif name == "backend":
+            from benchmarks import backend
+
+            results.update(backend.run(seed, min_time))
+    return results
+
+
+def write_results(path: str, results: dict[str, dict]) -> None:
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    print(f"{'benchmark':<36}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, result in sorted(current["results"].items()):
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<36}{'-':>12}{result['value']:>12.4g}{'new':>9}")
+            continue
+        change = (result["value"] - base["value"]) / base["value"]
+        if not result["higher_is_better"]:
+            change = -change
+        flag = ""
+        if change < -threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<36}{base['value']:>12.4g}{result['value']:>12.4g}"
+            f"{change:>+9.1%}{flag}"
+        )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run benchmarks")
+    run_parser.add_argument("--suite", action="append", choices=SUITES)
+    run_parser.add_argument("--output", default="benchmark_results.json")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--min-time", type=float, default=0.5)
+    run_parser.add_argument(
+        "--save-baseline", action="store_true", help=f"also write {BASELINE_FILE}"
+    )
+
+    compare_parser = commands.add_parser("compare", help="compare against baseline")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("--baseline", default=BASELINE_FILE)
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        results = run_suites(args.suite or list(SUITES), args.seed, args.min_time)
+        write_results(args.output, results)
+        print(f"Wrote {len(results)} results to {args.output}")
+        if args.save_baseline:
+            write_results(BASELINE_FILE, results)
+            print(f"Saved baseline to {BASELINE_FILE}")
+    else:
+        with open(args.results) as f:
+            current = json.load(f)
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import random
+import tracemalloc
+
+from benchmarks.engine import seeded_boards
+from engine import DIRECTIONS
+from game import Game
+
+
+def size(value: float, unit: str = "bytes") -> dict:
+    return {"value": value, "unit": unit, "higher_is_better": False}
+
+
+def transient_peak(call, items) -> float:
+    total = 0
+    for item in items:
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        call(item)
+        total += tracemalloc.get_traced_memory()[1] - current
+    return total / len(items)
+
+
+def retained(build) -> tuple[int, int]:
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(True, "*game.py")]
+    )
+    kept = build()
+    after = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(True, "*game.py")]
+    )
+    stats = after.compare_to(snapshot, "filename")
+    del kept
+    return sum(s.count_diff for s in stats), sum(s.size_diff for s in stats)
+
+
+def undo_history(seed: int, moves: int = 10_000, grid_size: int = 8) -> Game:
+    rng = random.Random(seed)
+    game = Game(seed=seed, grid_size=grid_size)
+    played = 0
+    while played < moves and not game.is_game_over():
+        if game.process_movement(rng.choice(DIRECTIONS)):
+            played += 1
+    return game
+
+
+def load(bitboard: int) -> Game:
+    game = Game()
+    game.load_bitboard(bitboard)
+    return game
+
+
+def run(seed: int = 0, min_time: float = 0.5) -> dict[str, dict]:
+    boards = seeded_boards(seed, 500)
+    games = [load(bitboard) for bitboard in boards]
+    rng = random.Random(seed)
+    moves = [(game, rng.choice(DIRECTIONS)) for game in games]
+
+    tracemalloc.start()
+    try:
+        results = {
+            "alloc.process_movement": size(
+                transient_peak(lambda m: m[0].process_movement(m[1]), moves)
+            ),
+            "alloc.get_empty_positions": size(
+                transient_peak(lambda g: g.board.get_empty_positions(), games)
+            ),
+            "alloc.is_game_over": size(
+                transient_peak(lambda g: g.is_game_over(), games)
+            ),
+        }
+        blocks, nbytes = retained(lambda: [load(bitboard) for bitboard in boards[:100]])
+        results["alloc.game_blocks"] = size(blocks / 100, "blocks")
+        results["alloc.game_bytes"] = size(nbytes / 100)
+        results["alloc.undo_record@4x4"] = size(Game().state_size)
+        before = tracemalloc.get_traced_memory()[0]
+        game = undo_history(seed)
+        results["alloc.undo_game_10k@8x8"] = size(
+            tracemalloc.get_traced_memory()[0] - before
+        )
+        results["alloc.undo_history_10k@8x8"] = size(game.history.nbytes)
+        results["alloc.undo_entries_10k@8x8"] = size(len(game.history), "entries")
+    finally:
+        tracemalloc.stop()
+    return results
@@ -0,0 +1,172 @@
+import asyncio
+import importlib.util
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.timing import latency, measure, rate
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend")
+SIZES = (100, 1_000, 10_000, 100_000)
+
+
+def add_backend_path() -> None:
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+
+def load_backend():
+    add_backend_path()
+    spec = importlib.util.spec_from_file_location(
+        "backend_main", os.path.join(BACKEND_DIR, "main.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def time_requests(send, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        response = send(i)
+        if response.status_code != 200:
+            raise RuntimeError(f"Request failed: {response.status_code}")
+    return count / (time.perf_counter() - start)
+
+
+def bench_size(size: int, seed: int, requests: int) -> dict[str, dict]:
+    from fastapi.testclient import TestClient
+
+    backend = load_backend()
+    from leaderboard import Leaderboard
+    from live import LiveLeaderboard
+    from store import ScoreStore
+
+    rng = random.Random(seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        backend.store = ScoreStore(os.path.join(directory, "bench.db"))
+        backend.leaderboard = Leaderboard(backend.store)
+        backend.live = LiveLeaderboard(backend.leaderboard)
+        backend.LEADERBOARD_FILE = os.path.join(directory, "leaderboard.json")
+        backend.REQUIRE_REPLAY = False
+        metrics_dir = backend.metrics.directory
+        backend.metrics.directory = os.path.join(directory, "metrics")
+        backend.store.add_many(
+            [(i + 1, f"player{i}", rng.randint(0, 100_000), None) for i in range(size)]
+        )
+
+        try:
+            with TestClient(backend.app) as client:
+                endpoints = {
+                    "best_score": lambda i: client.get("/get-best-score/"),
+                    "leaderboard": lambda i: client.get(
+                        "/get-leaderboard/", params={"skip": 0, "limit": 10}
+                    ),
+                    "leaderboard_deep": lambda i: client.get(
+                        "/get-leaderboard/", params={"skip": size // 2, "limit": 10}
+                    ),
+                    "rank": lambda i: client.get(f"/rank/{rng.randint(0, 100_000)}"),
+                    "submit": lambda i: client.post(
+                        "/submit-score/",
+                        json={"name": "bench", "score": rng.randint(0, 100_000)},
+                    ),
+                }
+                for name, send in endpoints.items():
+                    send(0)
+                    results[f"backend.{name}@{size}"] = latency(
+                        time_requests(send, requests)
+                    )
+        finally:
+            backend.metrics.directory = metrics_dir
+    return results
+
+
+def recorded_games(seed: int, count: int) -> list[tuple[int, bytes, int, int]]:
+    from engine import DIRECTIONS
+    from game import Game
+
+    rng = random.Random(seed)
+    replays = []
+    for _ in range(count):
+        game = Game(seed=rng.getrandbits(64))
+        while not game.is_game_over():
+            game.process_movement(rng.choice(DIRECTIONS))
+        replays.append((game.seed, game.moves.to_bytes(), len(game.moves), game.score))
+    return replays
+
+
+def bench_replays(seed: int, min_time: float) -> dict[str, dict]:
+    add_backend_path()
+    from verifier import ReplayVerifier, verify_replay
+
+    replays = recorded_games(seed, 50)
+
+    def run_inline() -> int:
+        for replay in replays:
+            if verify_replay(*replay) is not None:
+                raise RuntimeError("Recorded replay failed verification")
+        return len(replays)
+
+    verifier = ReplayVerifier()
+    verifier.start()
+    try:
+        verifier.verify_many(replays)
+        pooled = measure(lambda: len(verifier.verify_many(replays)), min_time)
+    finally:
+        verifier.stop()
+    return {
+        "backend.replay_verify": rate(measure(run_inline, min_time), "replays/s"),
+        "backend.replay_verify_pool": rate(pooled, "replays/s"),
+    }
+
+
+def bench_metrics(requests: int = 20_000) -> dict[str, dict]:
+    add_backend_path()
+    from metrics import Metrics, MetricsMiddleware
+
+    class Route:
+        path = "/rank/{score}"
+
+    async def endpoint(scope, receive, send) -> None:
+        scope["route"] = Route
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message) -> None:
+        pass
+
+    async def time_app(app) -> float:
+        scope = {"type": "http", "method": "GET"}
+        start = time.perf_counter()
+        for _ in range(requests):
+            await app(scope, None, send)
+        return time.perf_counter() - start
+
+    async def compare() -> float:
+        middleware = MetricsMiddleware(endpoint, Metrics())
+        bare = min([await time_app(endpoint) for _ in range(3)])
+        wrapped = min([await time_app(middleware) for _ in range(3)])
+        return (wrapped - bare) / requests
+
+    overhead = asyncio.run(compare())
+    return {
+        "backend.metrics_overhead": {
+            "value": overhead * 1e6,
+            "unit": "us",
+            "higher_is_better": False,
+        }
+    }
+
+
+def run(
+    seed: int = 0, min_time: float = 0.5, sizes: tuple[int, ...] = SIZES
+) -> dict[str, dict]:
+    requests = max(20, int(200 * min_time))
+    results = bench_replays(seed, min_time)
+    results.update(bench_metrics())
+    for size in sizes:
+        results.update(bench_size(size, seed, requests))
+    return results
@@ -0,0 +1,146 @@
+import random
+
+from benchmarks.timing import measure, rate
+from engine import DIRECTIONS, BitboardEngine
+from game import Board, Game
+
+
+def seeded_boards(seed: int, count: int) -> list[int]:
+    random.seed(seed)
+    game = Game()
+    boards = []
+    while len(boards) < count:
+        if not game.process_movement(random.choice(DIRECTIONS)):
+            if game.is_game_over():
+                game.reset()
+            continue
+        boards.append(game.to_bitboard())
+    return boards
+
+
+def bench_game_moves(seed: int, min_time: float, grid_size: int = 4) -> float:
+    random.seed(seed)
+    game = Game(grid_size=grid_size)
+
+    def run() -> int:
+        for _ in range(100):
+            if not game.process_movement(random.choice(DIRECTIONS)):
+                if game.is_game_over():
+                    game.reset()
+        return 100
+
+    return measure(run, min_time)
+
+
+def bench_empty_positions(boards: list[Board], min_time: float) -> float:
+    def run() -> int:
+        for board in boards:
+            board.get_empty_positions()
+        return len(boards)
+
+    return measure(run, min_time)
+
+
+def bench_is_game_over(games: list[Game], min_time: float) -> float:
+    def run() -> int:
+        for game in games:
+            game.is_game_over()
+        return len(games)
+
+    return measure(run, min_time)
+
+
+def bench_game_playouts(seed: int, min_time: float) -> float:
+    random.seed(seed)
+
+    def run() -> int:
+        game = Game()
+        while not game.is_game_over():
+            game.process_movement(random.choice(DIRECTIONS))
+        return 1
+
+    return measure(run, min_time, repeat=1)
+
+
+def bench_bitboard_moves(seed: int, min_time: float) -> float:
+    rng = random.Random(seed)
+    engine = BitboardEngine(rng=rng)
+    engine.reset()
+
+    def run() -> int:
+        for _ in range(1000):
+            if engine.move(rng.choice(DIRECTIONS))[2]:
+                engine.spawn()
+            elif engine.is_game_over():
+                engine.reset()
+        return 1000
+
+    return measure(run, min_time)
+
+
+def bench_bitboard_playouts(seed: int, min_time: float) -> float:
+    rng = random.Random(seed)
+
+    def run() -> int:
+        engine = BitboardEngine(rng=rng)
+        engine.reset()
+        while not engine.is_game_over():
+            if engine.move(rng.choice(DIRECTIONS))[2]:
+                engine.spawn()
+        return 1
+
+    return measure(run, min_time)
+
+
+def bench_batch_moves(seed: int, min_time: float, n: int = 1024) -> float | None:
+    try:
+        import numpy as np
+
+        from batch_game import BatchGame
+    except ImportError:
+        return None
+
+    batch = BatchGame(n, seed=seed)
+    batch.reset()
+    directions = np.random.default_rng(seed)
+
+    def run() -> int:
+        _, _, over = batch.step(directions.integers(0, 4, n))
+        batch.reset(over)
+        return n
+
+    return measure(run, min_time)
+
+
+def run(seed: int = 0, min_time: float = 0.5) -> dict[str, dict]:
+    boards = seeded_boards(seed, 500)
+    games = []
+    for bitboard in boards:
+        game = Game()
+        game.load_bitboard(bitboard)
+        games.append(game)
+
+    results = {
+        "engine.game_moves": rate(bench_game_moves(seed, min_time), "moves/s"),
+        "engine.get_empty_positions": rate(
+            bench_empty_positions([g.board for g in games], min_time)
+        ),
+        "engine.is_game_over": rate(bench_is_game_over(games, min_time)),
+        "engine.game_playouts": rate(bench_game_playouts(seed, min_time), "games/s"),
+        "engine.game_moves@5x5": rate(bench_game_moves(seed, min_time, 5), "moves/s"),
+        "engine.game_moves@8x8": rate(bench_game_moves(seed, min_time, 8), "moves/s"),
+        "engine.bitboard_moves": rate(bench_bitboard_moves(seed, min_time), "moves/s"),
+        "engine.bitboard_playouts": rate(
+            bench_bitboard_playouts(seed, min_time), "games/s"
+        ),
+    }
+    results["engine.move_cost_8x8_vs_4x4"] = {
+        "value": results["engine.game_moves"]["value"]
+        / results["engine.game_moves@8x8"]["value"],
+        "unit": "x",
+        "higher_is_better": False,
+    }
+    batch = bench_batch_moves(seed, min_time)
+    if batch is not None:
+        results["engine.batch_moves"] = rate(batch, "moves/s")
+    return results
@@ -0,0 +1,211 @@
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.__main__ import write_results
+from benchmarks.backend import BACKEND_DIR, add_backend_path
+
+SIZES = (10_000, 100_000, 1_000_000)
+SEED_CHUNK = 100_000
+MAX_SCORE = 100_000
+
+
+def seed_store(path: str, size: int, seed: int) -> None:
+    add_backend_path()
+    from store import ScoreStore
+
+    rng = random.Random(seed)
+    store = ScoreStore(path)
+    for start in range(0, size, SEED_CHUNK):
+        store.add_many(
+            [
+                (i + 1, f"player{i}", rng.randint(0, MAX_SCORE), None)
+                for i in range(start, min(size, start + SEED_CHUNK))
+            ]
+        )
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(directory: str, port: int, workers: int) -> subprocess.Popen:
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "main:app",
+        "--app-dir",
+        BACKEND_DIR,
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+        "--log-level",
+        "warning",
+        "--no-access-log",
+    ]
+    env = dict(os.environ, REQUIRE_REPLAY="0")
+    return subprocess.Popen(command, cwd=directory, env=env)
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/get-best-score/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+def pick_request(rng: random.Random, size: int, submit_ratio: float):
+    if rng.random() < submit_ratio:
+        body = {"name": "load", "score": rng.randint(0, MAX_SCORE)}
+        return "submit", "POST", "/submit-score/", body
+    kind = rng.choice(("best_score", "leaderboard", "leaderboard_deep", "rank"))
+    if kind == "best_score":
+        return kind, "GET", "/get-best-score/", None
+    if kind == "leaderboard":
+        return kind, "GET", "/get-leaderboard/?skip=0&limit=10", None
+    if kind == "leaderboard_deep":
+        return kind, "GET", f"/get-leaderboard/?skip={size // 2}&limit=10", None
+    return kind, "GET", f"/rank/{rng.randint(0, MAX_SCORE)}", None
+
+
+def percentile(samples: list[float], q: float) -> float:
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+async def drive(
+    url: str,
+    size: int,
+    duration: float,
+    concurrency: int,
+    submit_ratio: float,
+    seed: int,
+) -> tuple[dict[str, list[float]], int, float]:
+    samples: dict[str, list[float]] = {}
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        await wait_ready(client)
+
+        async def worker(rng: random.Random) -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                kind, method, path, body = pick_request(rng, size, submit_ratio)
+                sent = time.perf_counter()
+                response = await client.request(method, path, json=body)
+                elapsed = time.perf_counter() - sent
+                if response.status_code != 200:
+                    errors += 1
+                    continue
+                samples.setdefault(kind, []).append(elapsed)
+
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(
+            *(worker(random.Random(seed + i)) for i in range(concurrency))
+        )
+        elapsed = time.perf_counter() - start
+    return samples, errors, elapsed
+
+
+def latency_ms(seconds: float) -> dict:
+    return {"value": seconds * 1000, "unit": "ms", "higher_is_better": False}
+
+
+def summarize(
+    size: int, samples: dict[str, list[float]], elapsed: float
+) -> dict[str, dict]:
+    samples["all"] = [s for kind in list(samples) for s in samples[kind]]
+    results = {}
+    for kind, values in samples.items():
+        values.sort()
+        results[f"load.{kind}_p50@{size}"] = latency_ms(percentile(values, 0.5))
+        results[f"load.{kind}_p99@{size}"] = latency_ms(percentile(values, 0.99))
+        results[f"load.{kind}_rps@{size}"] = {
+            "value": len(values) / elapsed,
+            "unit": "req/s",
+            "higher_is_better": True,
+        }
+    return results
+
+
+def run_size(size: int, args: argparse.Namespace) -> dict[str, dict]:
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Seeding {size} scores...", file=sys.stderr)
+        seed_store(os.path.join(directory, "2048_game.db"), size, args.seed)
+        port = free_port()
+        server = start_server(directory, port, args.workers)
+        try:
+            samples, errors, elapsed = asyncio.run(
+                drive(
+                    f"http://127.0.0.1:{port}",
+                    size,
+                    args.duration,
+                    args.concurrency,
+                    args.submit_ratio,
+                    args.seed,
+                )
+            )
+        finally:
+            server.terminate()
+            server.wait()
+    if errors:
+        print(f"{errors} requests failed at {size} scores", file=sys.stderr)
+    return summarize(size, samples, elapsed)
+
+
+def report(size: int, results: dict[str, dict]) -> None:
+    print(f"{size} scores")
+    print(f"{'request':<20}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    kinds = sorted(
+        {name[5:].split("@")[0].rsplit("_", 1)[0] for name in results} - {"all"}
+    ) + ["all"]
+    for kind in kinds:
+        rps, p50, p99 = (
+            results[f"load.{kind}_{stat}@{size}"]["value"]
+            for stat in ("rps", "p50", "p99")
+        )
+        print(f"{kind:<20}{rps:>10.0f}{p50:>10.2f}{p99:>10.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest")
+    parser.add_argument(
+        "--sizes", default=",".join(str(size) for size in SIZES), help="stored scores"
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--submit-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    results = {}
+    for size in (int(size) for size in args.sizes.split(",")):
+        size_results = run_size(size, args)
+        report(size, size_results)
+        results.update(size_results)
+    if args.output:
+        write_results(args.output, results)
+        print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import os
+import random
+
+from benchmarks.engine import seeded_boards
+from benchmarks.timing import latency, measure
+
+
+def run(seed: int = 0, min_time: float = 0.5) -> dict[str, dict]:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+
+    from animation import Animator
+    from engine import DIRECTIONS
+    from fonts import clear_fonts
+    from game import Game
+    from renderer import Renderer
+
+    pygame.init()
+    screen = pygame.display.set_mode((1000, 800))
+    boards = seeded_boards(seed, 200)
+    game = Game()
+    results = {}
+
+    try:
+        for name, dirty_rects in (("full", False), ("dirty", True)):
+            renderer = Renderer(screen, 4, dirty_rects=dirty_rects)
+
+            def frames() -> int:
+                for bitboard in boards:
+                    game.load_bitboard(bitboard)
+                    for _ in range(10):
+                        renderer.draw_game(game)
+                return len(boards) * 10
+
+            results[f"render.{name}_frame"] = latency(measure(frames, min_time))
+
+        renderer = Renderer(screen, 4)
+        animator = Animator()
+        rng = random.Random(seed)
+
+        def animated() -> int:
+            frames = 0
+            for bitboard in boards[:20]:
+                game.load_bitboard(bitboard)
+                if not game.process_movement(rng.choice(DIRECTIONS)):
+                    continue
+                animator.start(game.last_turn, 0.0)
+                for step in range(14):
+                    animator.update(step / 60)
+                    renderer.draw_game(game, ghosts=animator.ghosts)
+                    frames += 1
+            return max(frames, 1)
+
+        results["render.dirty_animated_frame"] = latency(measure(animated, min_time))
+    finally:
+        clear_fonts()
+        pygame.quit()
+    return results
@@ -0,0 +1,23 @@
+import time
+from typing import Callable
+
+
+def measure(run: Callable[[], int], min_time: float = 0.5, repeat: int = 3) -> float:
+    best = 0.0
+    for _ in range(repeat):
+        ops = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            ops += run()
+            elapsed = time.perf_counter() - start
+        best = max(best, ops / elapsed)
+    return best
+
+
+def rate(value: float, unit: str = "ops/s") -> dict:
+    return {"value": value, "unit": unit, "higher_is_better": True}
+
+
+def latency(ops_per_sec: float) -> dict:
+    return {"value": 1000 / ops_per_sec, "unit": "ms", "higher_is_better": False}
@@ -0,0 +1,212 @@
+import random
+from functools import cache
+
+ROW_MASK = 0xFFFF
+CELL_MASK = 0xF
+NUM_CELLS = 16
+DIRECTIONS = ("left", "right", "up", "down")
+
+
+def _slide_row_left(cells: list[int]) -> tuple[list[int], int]:
+    tiles = [c for c in cells if c]
+    result = []
+    score = 0
+    i = 0
+    while i < len(tiles):
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1] and tiles[i] < CELL_MASK:
+            exponent = tiles[i] + 1
+            result.append(exponent)
+            score += 1 << exponent
+            i += 2
+        else:
+            result.append(tiles[i])
+            i += 1
+    return result + [0] * (len(cells) - len(result)), score
+
+
+def _pack_row(cells: list[int]) -> int:
+    return cells[0] | cells[1] << 4 | cells[2] << 8 | cells[3] << 12
+
+
+def _unpack_row(row: int) -> list[int]:
+    return [row & 0xF, (row >> 4) & 0xF, (row >> 8) & 0xF, (row >> 12) & 0xF]
+
+
+@cache
+def row_tables() -> tuple[list[int], list[int], list[int]]:
+    left = [0] * 65536
+    right = [0] * 65536
+    score = [0] * 65536
+    for row in range(65536):
+        cells = _unpack_row(row)
+        moved, gained = _slide_row_left(cells)
+        left[row] = _pack_row(moved)
+        score[row] = gained
+        moved, _ = _slide_row_left(cells[::-1])
+        right[row] = _pack_row(moved[::-1])
+    return left, right, score
+
+
+def transpose(board: int) -> int:
+    a1 = board & 0xF0F00F0FF0F00F0F
+    a2 = board & 0x0000F0F00000F0F0
+    a3 = board & 0x0F0F00000F0F0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00FF0000FF00FF
+    b2 = a & 0x00FF00FF00000000
+    b3 = a & 0x00000000FF00FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def _move_rows(board: int, table: list[int], score: list[int]) -> tuple[int, int]:
+    r0 = board & ROW_MASK
+    r1 = (board >> 16) & ROW_MASK
+    r2 = (board >> 32) & ROW_MASK
+    r3 = (board >> 48) & ROW_MASK
+    new_board = table[r0] | table[r1] << 16 | table[r2] << 32 | table[r3] << 48
+    return new_board, score[r0] + score[r1] + score[r2] + score[r3]
+
+
+def move_board(board: int, direction: str) -> tuple[int, int]:
+    left, right, score = row_tables()
+    if direction == "left":
+        return _move_rows(board, left, score)
+    if direction == "right":
+        return _move_rows(board, right, score)
+    if direction == "up":
+        moved, gained = _move_rows(transpose(board), left, score)
+        return transpose(moved), gained
+    if direction == "down":
+        moved, gained = _move_rows(transpose(board), right, score)
+        return transpose(moved), gained
+    raise ValueError(f"Unknown direction: {direction}")
+
+
+def count_empty(board: int) -> int:
+    occupied = board | (board >> 1)
+    occupied |= occupied >> 2
+    return NUM_CELLS - (occupied & 0x1111111111111111).bit_count()
+
+
+def empty_cells(board: int) -> list[int]:
+    return [i for i in range(NUM_CELLS) if not (board >> (4 * i)) & CELL_MASK]
+
+
+def is_game_over(board: int) -> bool:
+    if count_empty(board):
+        return False
+    left, _, score = row_tables()
+    if _move_rows(board, left, score)[0] != board:
+        return False
+    return _move_rows(transpose(board), left, score)[0] == transpose(board)
+
+
+def max_exponent(board: int) -> int:
+    return max((board >> (4 * i)) & CELL_MASK for i in range(NUM_CELLS))
+
+
+def from_values(values: list[list[int]]) -> int:
+    board = 0
+    for row, line in enumerate(values):
+        for col, value in enumerate(line):
+            if value:
+                exponent = value.bit_length() - 1
+                if exponent > CELL_MASK or value != 1 << exponent:
+                    raise ValueError(f"Tile value {value} cannot be packed")
+                board |= exponent << (4 * (row * 4 + col))
+    return board
+
+
+def to_values(board: int) -> list[list[int]]:
+    values = []
+    for row in range(4):
+        line = []
+        for col in range(4):
+            exponent = (board >> (4 * (row * 4 + col))) & CELL_MASK
+            line.append(1 << exponent if exponent else 0)
+        values.append(line)
+    return values
+
+
+class BitboardEngine:
+    def __init__(
+        self, board: int = 0, score: int = 0, rng: random.Random | None = None
+    ):
+        self.board = board
+        self.score = score
+        self.rng = rng or random.Random()
+
+    def reset(self) -> None:
+        self.board = 0
+        self.score = 0
+        self.spawn()
+        self.spawn()
+
+    def move(self, direction: str) -> tuple[int, int, bool]:
+        new_board, gained = move_board(self.board, direction)
+        changed = new_board != self.board
+        if changed:
+            self.board = new_board
+            self.score += gained
+        return new_board, gained, changed
+
+    def empty_cells(self) -> list[int]:
+        return empty_cells(self.board)
+
+    def spawn(self) -> int | None:
+        empty = empty_cells(self.board)
+        if not empty:
+            return None
+        index = self.rng.choice(empty)
+        exponent = 2 if self.rng.random() > 0.9 else 1
+        self.board |= exponent << (4 * index)
+        return index
+
+    def is_game_over(self) -> bool:
+        return is_game_over(self.board)
+
+    def max_tile(self) -> int:
+        exponent = max_exponent(self.board)
+        return 1 << exponent if exponent else 0
+
+    def to_values(self) -> list[list[int]]:
+        return to_values(self.board)
+
+
+class MoveLog:
+    def __init__(self, data: bytes = b"", count: int = 0):
+        if not 0 <= count <= len(data) * 4:
+            raise ValueError(f"{len(data)} bytes cannot hold {count} moves")
+        self.data = bytearray(data[: (count + 3) // 4])
+        self.count = count
+        if count & 3:
+            self.data[-1] &= (1 << (2 * (count & 3))) - 1
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self):
+        data = self.data
+        for i in range(self.count):
+            yield (data[i >> 2] >> (2 * (i & 3))) & 3
+
+    def append(self, move: int) -> None:
+        if self.count & 3 == 0:
+            self.data.append(0)
+        self.data[-1] |= move << (2 * (self.count & 3))
+        self.count += 1
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.data)
+
+    def pop(self) -> int:
+        if not self.count:
+            raise IndexError("pop from empty move log")
+        self.count -= 1
+        shift = 2 * (self.count & 3)
+        move = (self.data[-1] >> shift) & 3
+        if shift:
+            self.data[-1] &= (1 << shift) - 1
+        else:
+            self.data.pop()
+        return move
@@ -0,0 +1,70 @@
+from collections import OrderedDict
+from functools import cache
+
+import pygame
+
+TEXT_CACHE_BYTES = 8 * 1024 * 1024
+
+
+@cache
+def get_font(size: int) -> pygame.font.Font:
+    return pygame.font.Font(None, size)
+
+
+class TextCache:
+    def __init__(self, max_bytes: int = TEXT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(
+        self, font: pygame.font.Font, text: str, color: tuple[int, int, int]
+    ) -> pygame.Surface:
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        self.nbytes += surface.get_pitch() * surface.get_height()
+        while self.nbytes > self.max_bytes and len(self.surfaces) > 1:
+            _, evicted = self.surfaces.popitem(last=False)
+            self.nbytes -= evicted.get_pitch() * evicted.get_height()
+            self.evictions += 1
+        return surface
+
+    def clear(self) -> None:
+        self.surfaces.clear()
+        self.nbytes = 0
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.surfaces),
+            "bytes": self.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+text_cache = TextCache()
+
+
+def render_text(
+    font: pygame.font.Font, text: str, color: tuple[int, int, int]
+) -> pygame.Surface:
+    return text_cache.render(font, text, color)
+
+
+def clear_fonts() -> None:
+    text_cache.clear()
+    get_font.cache_clear()
@@ -1,282 +1,462 @@
+import base64
 import random
-import requests
+import struct
 from dataclasses import dataclass
+from functools import cache
+from api_client import ApiClient, ApiResponse
+from engine import CELL_MASK, DIRECTIONS, MoveLog, from_values
+from history import History
 
 GRID_SIZE = 4
-TILE_SIZE = 800 // GRID_SIZE
-VELOCITY = 50
+WIN_TILE = 2048
+MAX_TILE = 1 << CELL_MASK
+STATE = struct.Struct("<IIB")
+SNAPSHOT = struct.Struct("<4sBBBIQQI")
+SNAPSHOT_MAGIC = b"2048"
+SNAPSHOT_VERSION = 1
 
 
-@dataclass
-class Position:
-    row: int
-    col: int
+class GameRandom(random.Random):
+    def seed(self, a=None, version=2):
+        super().seed(a, version)
+        self.draws = 0
 
-    def __hash__(self):
-        return hash((self.row, self.col))
+    def random(self) -> float:
+        self.draws += 2
+        return super().random()
 
-    def __eq__(self, other):
-        if not isinstance(other, Position):
-            return False
-        return self.row == other.row and self.col == other.col
+    def getrandbits(self, k: int) -> int:
+        self.draws += (k + 31) // 32
+        return super().getrandbits(k)
+
+    def restore(self, seed: int, draws: int) -> None:
+        self.seed(seed)
+        if draws:
+            super().getrandbits(32 * draws)
+        self.draws = draws
+
+
+class Position:
+    __slots__ = ("row", "col")
+    _interned: dict[tuple[int, int], "Position"] = {}
+
+    def __new__(cls, row: int, col: int):
+        pos = cls._interned.get((row, col))
+        if pos is None:
+            pos = object.__new__(cls)
+            object.__setattr__(pos, "row", row)
+            object.__setattr__(pos, "col", col)
+            cls._interned[(row, col)] = pos
+        return pos
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Position is immutable")
+
+    def __reduce__(self):
+        return Position, (self.row, self.col)
+
+    def __repr__(self):
+        return f"Position(row={self.row}, col={self.col})"
+
+
+DIRECTION_STEPS = {
+    "left": (0, -1),
+    "right": (0, 1),
+    "up": (-1, 0),
+    "down": (1, 0),
+}
+
+
+@cache
+def grid_positions(size: int) -> tuple[Position, ...]:
+    return tuple(Position(row, col) for row in range(size) for col in range(size))
+
+
+@cache
+def neighbor_table(size: int) -> dict[tuple[int, int], tuple[Position | None, ...]]:
+    table = {}
+    for dy, dx in DIRECTION_STEPS.values():
+        table[(dy, dx)] = tuple(
+            (
+                Position(pos.row + dy, pos.col + dx)
+                if 0 <= pos.row + dy < size and 0 <= pos.col + dx < size
+                else None
+            )
+            for pos in grid_positions(size)
+        )
+    return table
+
+
+@cache
+def adjacency(size: int) -> dict[Position, tuple[int, tuple[Position, ...]]]:
+    table = neighbor_table(size)
+    return {
+        pos: (
+            1 << index,
+            tuple(step[index] for step in table.values() if step[index] is not None),
+        )
+        for index, pos in enumerate(grid_positions(size))
+    }
+
+
+@cache
+def grid_lines(size: int) -> dict[str, tuple[tuple[Position, ...], ...]]:
+    rows = [[Position(row, col) for col in range(size)] for row in range(size)]
+    cols = [[Position(row, col) for row in range(size)] for col in range(size)]
+    return {
+        "left": tuple(tuple(line) for line in rows),
+        "right": tuple(tuple(reversed(line)) for line in rows),
+        "up": tuple(tuple(line) for line in cols),
+        "down": tuple(tuple(reversed(line)) for line in cols),
+    }
 
 
 class Tile:
+    __slots__ = ("value", "pos", "x", "y", "scale", "moved")
+
     def __init__(self, value: int, row: int, col: int):
         self.value = value
         self.pos = Position(row, col)
-        self.x = col * TILE_SIZE
-        self.y = row * TILE_SIZE
-        self.vx = 0
-        self.vy = 0
-        self.merging = False
+        self.x = col
+        self.y = row
+        self.scale = 1.0
         self.moved = False
 
-    def update(self) -> bool:
-        if abs(self.vx) < 0.1 and abs(self.vy) < 0.1:
-            self.vx = 0
-            self.vy = 0
-            return False
-
-        target_x = self.pos.col * TILE_SIZE
-        target_y = self.pos.row * TILE_SIZE
-
-        dx = target_x - self.x
-        dy = target_y - self.y
-
-        if abs(dx) < abs(self.vx):
-            self.x = target_x
-            self.vx = 0
-        else:
-            self.x += self.vx
-
-        if abs(dy) < abs(self.vy):
-            self.y = target_y
-            self.vy = 0
-        else:
-            self.y += self.vy
+    def stop(self):
+        self.x = self.pos.col
+        self.y = self.pos.row
+        self.scale = 1.0
 
-        return self.vx != 0 or self.vy != 0
 
-    def stop(self):
-        self.vx = 0
-        self.vy = 0
-        self.x = self.pos.col * TILE_SIZE
-        self.y = self.pos.row * TILE_SIZE
+@dataclass
+class Turn:
+    slides: list[tuple[Tile, float, float]]
+    merges: list[tuple[Tile, Tile]]
+    spawned: Tile | None
 
 
 class Board:
-    def __init__(self):
+    def __init__(self, size: int = GRID_SIZE):
+        self.size = size
         self.tiles: dict[Position, Tile] = {}
-        self.moving_tiles: set[Tile] = set()
+        self.empty_mask = (1 << size * size) - 1
+        self.mergeable_pairs = 0
+        self.adjacency = adjacency(size)
 
     def get_tile(self, pos: Position) -> Tile | None:
         return self.tiles.get(pos)
 
     def add_tile(self, tile: Tile):
-        self.tiles[tile.pos] = tile
+        pos = tile.pos
+        tiles = self.tiles
+        if pos in tiles:
+            self.remove_tile(pos)
+        bit, neighbors = self.adjacency[pos]
+        self.empty_mask &= ~bit
+        value = tile.value
+        if value >= MAX_TILE:
+            neighbors = ()
+        for neighbor in neighbors:
+            other = tiles.get(neighbor)
+            if other is not None and other.value == value:
+                self.mergeable_pairs += 1
+        tiles[pos] = tile
 
     def remove_tile(self, pos: Position):
-        if pos in self.tiles:
-            del self.tiles[pos]
+        tile = self.tiles.pop(pos, None)
+        if tile is not None:
+            bit, neighbors = self.adjacency[pos]
+            self.empty_mask |= bit
+            self.mergeable_pairs -= self.matching_neighbors(pos, tile.value)
+
+    def matching_neighbors(self, pos: Position, value: int) -> int:
+        if value >= MAX_TILE:
+            return 0
+        tiles = self.tiles
+        count = 0
+        for neighbor in self.adjacency[pos][1]:
+            other = tiles.get(neighbor)
+            if other is not None and other.value == value:
+                count += 1
+        return count
+
+    @property
+    def empty_count(self) -> int:
+        return self.empty_mask.bit_count()
+
+    def has_moves(self) -> bool:
+        return self.empty_mask != 0 or self.mergeable_pairs > 0
 
     def get_empty_positions(self) -> list[Position]:
+        positions = grid_positions(self.size)
         empty = []
-        for row in range(GRID_SIZE):
-            for col in range(GRID_SIZE):
-                pos = Position(row, col)
-                if pos not in self.tiles:
-                    empty.append(pos)
+        mask = self.empty_mask
+        while mask:
+            low = mask & -mask
+            empty.append(positions[low.bit_length() - 1])
+            mask ^= low
         return empty
 
-    def start_move(self, tile: Tile, direction: tuple[int, int]):
-        dx, dy = direction
-        tile.vx = dx * VELOCITY
-        tile.vy = dy * VELOCITY
-        self.moving_tiles.add(tile)
+    def random_empty_position(self, rng=random) -> Position | None:
+        mask = self.empty_mask
+        if not mask:
+            return None
+        for _ in range(rng.randrange(mask.bit_count())):
+            mask &= mask - 1
+        return grid_positions(self.size)[(mask & -mask).bit_length() - 1]
+
+    def check_consistency(self):
+        empty = [pos for pos in grid_positions(self.size) if pos not in self.tiles]
+        if empty != self.get_empty_positions():
+            raise AssertionError(
+                f"Empty cells {self.get_empty_positions()} should be {empty}"
+            )
+        pairs = 0
+        for pos, tile in self.tiles.items():
+            if tile.pos is not pos:
+                raise AssertionError(f"Tile at {pos} thinks it is at {tile.pos}")
+            pairs += self.matching_neighbors(pos, tile.value)
+        if pairs // 2 != self.mergeable_pairs:
+            raise AssertionError(
+                f"Mergeable pairs {self.mergeable_pairs} should be {pairs // 2}"
+            )
+
+    @classmethod
+    def from_bitboard(cls, bitboard: int) -> "Board":
+        board = cls(4)
+        for index in range(16):
+            exponent = (bitboard >> (4 * index)) & CELL_MASK
+            if exponent:
+                row, col = divmod(index, 4)
+                board.add_tile(Tile(1 << exponent, row, col))
+        return board
 
 
 class Game:
-    def __init__(self):
-        self.board = Board()
+    def __init__(
+        self,
+        client: ApiClient | None = None,
+        seed: int | None = None,
+        grid_size: int = GRID_SIZE,
+        win_tile: int = WIN_TILE,
+    ):
+        self.grid_size = grid_size
+        self.win_tile = win_tile
+        self.board = Board(grid_size)
         self.score = 0
-        self.best_score = self.load_best_score()
-        self.moving = False
-        self.moved_this_turn = False
+        self.best_score = 0
+        self.best_score_pending = client is not None
+        if client is not None:
+            self.load_best_score(client)
         self.has_shown_win = False
-        self.reset()
-
-    def reset(self):
-        self.board = Board()
+        self.reset(seed)
+
+    def reset(self, seed: int | None = None):
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.rng = GameRandom(self.seed)
+        self.moves = MoveLog()
+        self.history = History(self.state_size)
+        self.redo_moves: list[str] = []
+        self.board = Board(self.grid_size)
         self.score = 0
         self.win = False
         self.has_shown_win = False
-        self.moving = False
-        self.moved_this_turn = False
+        self.last_turn = None
         self.add_random_tile()
         self.add_random_tile()
 
-    def add_random_tile(self):
-        empty = self.board.get_empty_positions()
-        if empty:
-            pos = random.choice(empty)
-            value = 4 if random.random() > 0.9 else 2
-            new_tile = Tile(value, pos.row, pos.col)
-            self.board.add_tile(new_tile)
-
-    def find_farthest_position(
-        self, pos: Position, dy: int, dx: int
-    ) -> tuple[Position, bool]:
-        prev = Position(pos.row, pos.col)
-        while True:
-            next_pos = Position(prev.row + dy, prev.col + dx)
-            if not (0 <= next_pos.row < GRID_SIZE and 0 <= next_pos.col < GRID_SIZE):
-                return prev, False
-
-            next_tile = self.board.get_tile(next_pos)
-            if next_tile is None:
-                prev = next_pos
-            elif (
-                next_tile.value == self.board.get_tile(pos).value
-                and not next_tile.merging
-            ):
-                return next_pos, True
-            else:
-                return prev, False
-
-    def process_movement(self, direction: str):
-        if self.moving:
-            return
-
-        velocity_map = {"left": (0, -1), "right": (0, 1), "up": (-1, 0), "down": (1, 0)}
-        dy, dx = velocity_map[direction]
-
-        self.moved_this_turn = False
-        for tile in self.board.tiles.values():
-            tile.merging = False
+    def add_random_tile(self) -> Tile | None:
+        pos = self.board.random_empty_position(self.rng)
+        if pos is None:
+            return None
+        value = 4 if self.rng.random() > 0.9 else 2
+        new_tile = Tile(value, pos.row, pos.col)
+        self.board.add_tile(new_tile)
+        return new_tile
+
+    @property
+    def state_size(self) -> int:
+        return (5 * self.grid_size * self.grid_size + 7) // 8 + STATE.size
+
+    def pack_state(self) -> bytes:
+        cells = 0
+        size = self.grid_size
+        for pos, tile in self.board.tiles.items():
+            exponent = tile.value.bit_length() - 1
+            cells |= exponent << (5 * (pos.row * size + pos.col))
+        return cells.to_bytes(self.state_size - STATE.size, "little") + STATE.pack(
+            self.score, self.rng.draws, self.win
+        )
+
+    def unpack_state(self, data: bytes) -> None:
+        split = self.state_size - STATE.size
+        cells = int.from_bytes(data[:split], "little")
+        self.score, draws, win = STATE.unpack(data[split:])
+        self.win = bool(win)
+        self.rng.restore(self.seed, draws)
+        board = Board(self.grid_size)
+        for index, pos in enumerate(grid_positions(self.grid_size)):
+            exponent = (cells >> (5 * index)) & 0x1F
+            if exponent:
+                board.add_tile(Tile(1 << exponent, pos.row, pos.col))
+        self.board = board
+        self.last_turn = None
+
+    def snapshot(self) -> bytes:
+        flags = self.has_shown_win | (self.moves is not None) << 1
+        moves = self.moves.to_bytes() if self.moves is not None else b""
+        header = SNAPSHOT.pack(
+            SNAPSHOT_MAGIC,
+            SNAPSHOT_VERSION,
+            self.grid_size,
+            flags,
+            self.win_tile,
+            self.seed,
+            self.best_score,
+            len(self.moves) if self.moves is not None else 0,
+        )
+        return header + self.pack_state() + moves
+
+    def load_snapshot(self, data: bytes) -> None:
+        if len(data) < SNAPSHOT.size:
+            raise ValueError("Snapshot is truncated")
+        magic, version, grid_size, flags, win_tile, seed, best_score, count = (
+            SNAPSHOT.unpack_from(data)
+        )
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("Not a version 1 game snapshot")
+        state_size = (5 * grid_size * grid_size + 7) // 8 + STATE.size
+        moves = data[SNAPSHOT.size + state_size :]
+        if len(data) < SNAPSHOT.size + state_size or len(moves) < (count + 3) // 4:
+            raise ValueError("Snapshot is truncated")
+
+        self.grid_size = grid_size
+        self.win_tile = win_tile
+        self.seed = seed
+        self.rng = GameRandom(seed)
+        self.moves = MoveLog(moves, count) if flags & 2 else None
+        self.history = History(self.state_size)
+        self.redo_moves = []
+        self.unpack_state(data[SNAPSHOT.size : SNAPSHOT.size + state_size])
+        self.best_score = max(self.best_score, best_score)
+        self.has_shown_win = bool(flags & 1)
+
+    def undo(self) -> bool:
+        if not self.history:
+            return False
+        self.unpack_state(self.history.pop())
+        if self.moves is not None:
+            self.redo_moves.append(DIRECTIONS[self.moves.pop()])
+        return True
+
+    def redo(self) -> bool:
+        if not self.redo_moves:
+            return False
+        redo_moves = self.redo_moves
+        self.redo_moves = []
+        moved = self.process_movement(redo_moves.pop())
+        self.redo_moves = redo_moves
+        return moved
+
+    def process_movement(self, direction: str) -> bool:
+        state = self.pack_state()
+        board = self.board
+        tiles = board.tiles
+        for tile in tiles.values():
             tile.moved = False
 
-        positions = [(r, c) for r in range(GRID_SIZE) for c in range(GRID_SIZE)]
-        if dx > 0:  # right
-            positions.sort(key=lambda p: p[1], reverse=True)
-        elif dx < 0:  # left
-            positions.sort(key=lambda p: p[1])
-        elif dy > 0:  # down
-            positions.sort(key=lambda p: p[0], reverse=True)
-        else:  # up
-            positions.sort(key=lambda p: p[0])
-
-        pending_merges = {}
-
-        for row, col in positions:
-            pos = Position(row, col)
-            tile = self.board.get_tile(pos)
-
-            if tile is None:
-                continue
-
-            farthest_pos, will_merge = self.find_farthest_position(pos, dy, dx)
-
-            if farthest_pos.row == row and farthest_pos.col == col:
-                continue
-
-            self.board.remove_tile(pos)
-
-            if will_merge:
-                if farthest_pos not in pending_merges:
-                    pending_merges[farthest_pos] = []
-                pending_merges[farthest_pos].append(tile)
-                tile.merging = True
-            else:
-                tile.pos = farthest_pos
-                self.board.add_tile(tile)
-
-            tile.moved = True
-
-            final_x = farthest_pos.col * TILE_SIZE
-            final_y = farthest_pos.row * TILE_SIZE + 100
-
-            dx_pixels = final_x - tile.x
-            dy_pixels = final_y - tile.y
-            distance = (dx_pixels**2 + dy_pixels**2) ** 0.5
-
-            if distance > 0:
-                tile.vx = (dx_pixels / distance) * VELOCITY
-                tile.vy = (dy_pixels / distance) * VELOCITY
-                self.board.moving_tiles.add(tile)
-                self.moved_this_turn = True
-
-        for pos, tiles in pending_merges.items():
-            existing_tile = self.board.get_tile(pos)
-            if existing_tile:
-                tiles.append(existing_tile)
-
-            keeper = tiles[0]
-            keeper.value *= 2
-            keeper.pos = pos
-            keeper.moved = True
-            self.score += keeper.value
-            if keeper.value >= 2048:  # win condition
-                self.win = True
-            if self.score > self.best_score:
-                self.best_score = self.score
-
-            self.board.add_tile(keeper)
-
-            for tile in tiles[1:]:
-                if tile in self.board.moving_tiles:
-                    self.board.moving_tiles.remove(tile)
-
-        if self.moved_this_turn:
-            self.moving = True
-
-    def update(self) -> None:
-        if not self.moving:
-            return
-
-        still_moving = False
-
-        for tile in list(self.board.moving_tiles):
-            if tile.update():
-                still_moving = True
-            else:
-                self.board.moving_tiles.remove(tile)
-
-        if not still_moving:
-            self.moving = False
-            for tile in self.board.tiles.values():
+        slides = []
+        merges = []
+        for line in grid_lines(self.grid_size)[direction]:
+            target = 0
+            last = None
+            for pos in line:
+                tile = tiles.get(pos)
+                if tile is None:
+                    continue
+
+                if (
+                    last is not None
+                    and last.value == tile.value
+                    and tile.value < MAX_TILE
+                ):
+                    dest = line[target - 1]
+                    board.remove_tile(pos)
+                    board.remove_tile(dest)
+                    tile.value *= 2
+                    self.score += tile.value
+                    if tile.value >= self.win_tile:
+                        self.win = True
+                    merges.append((tile, last))
+                    last = None
+                else:
+                    dest = line[target]
+                    target += 1
+                    last = tile
+                    if dest is pos:
+                        continue
+                    board.remove_tile(pos)
+
+                tile.pos = dest
+                board.add_tile(tile)
+                tile.moved = True
+                slides.append((tile, tile.x, tile.y))
                 tile.stop()
-                tile.merging = False
 
-            if self.moved_this_turn:
-                self.add_random_tile()
-                self.moved_this_turn = False
+        if self.score > self.best_score:
+            self.best_score = self.score
 
-    def load_best_score(self) -> int:
-        try:
-            response = requests.get("http://127.0.0.1:8000/get-best-score/", timeout=5)
-            if response.status_code == 200:
-                return response.json()["best_score"]
-            return 0
-        except requests.RequestException:
-            return 0
-
-    def is_game_over(self) -> bool:
-        if len(self.board.tiles) < GRID_SIZE * GRID_SIZE:
+        if not slides:
             return False
 
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                pos = Position(r, c)
-                tile = self.board.get_tile(pos)
-                if tile:
-                    for dr, dc in [(0, 1), (1, 0)]:
-                        next_pos = Position(r + dr, c + dc)
-                        if (
-                            0 <= next_pos.row < GRID_SIZE
-                            and 0 <= next_pos.col < GRID_SIZE
-                        ):
-                            next_tile = self.board.get_tile(next_pos)
-                            if next_tile and tile.value == next_tile.value:
-                                return False
+        self.history.push(state)
+        self.redo_moves.clear()
+        if self.moves is not None:
+            self.moves.append(DIRECTIONS.index(direction))
+        self.last_turn = Turn(slides, merges, self.add_random_tile())
         return True
+
+    def to_bitboard(self) -> int:
+        if self.grid_size != 4:
+            raise ValueError("Only 4x4 boards can be packed")
+        values = [[0] * 4 for _ in range(4)]
+        for pos, tile in self.board.tiles.items():
+            values[pos.row][pos.col] = tile.value
+        return from_values(values)
+
+    def load_bitboard(self, bitboard: int, score: int | None = None) -> None:
+        if self.grid_size != 4:
+            raise ValueError("Only 4x4 boards can be unpacked")
+        self.board = Board.from_bitboard(bitboard)
+        self.moves = None
+        self.history.clear()
+        self.redo_moves.clear()
+        if score is not None:
+            self.score = score
+            self.best_score = max(self.best_score, score)
+        self.last_turn = None
+
+    @property
+    def submittable(self) -> bool:
+        return self.moves is not None and self.grid_size == 4
+
+    def replay(self) -> dict | None:
+        if self.moves is None:
+            return None
+        return {
+            "seed": self.seed,
+            "moves": base64.b64encode(self.moves.to_bytes()).decode("ascii"),
+            "count": len(self.moves),
+            "size": self.grid_size,
+        }
+
+    def load_best_score(self, client: ApiClient) -> None:
+        client.get("/get-best-score/", self.on_best_score)
+
+    def on_best_score(self, response: ApiResponse) -> None:
+        self.best_score_pending = False
+        if response.ok:
+            self.best_score = max(self.best_score, response.data["best_score"])
+
+    def is_game_over(self) -> bool:
+        return not self.board.has_moves()
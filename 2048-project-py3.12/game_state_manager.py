@@ -1,9 +1,25 @@
 class GameStateManager:
     def __init__(self):
         self.current_state = "start"
+        self.factories = {}
+        self.screens = {}
 
     def set_state(self, state):
         self.current_state = state
 
     def get_state(self):
         return self.current_state
+
+    def register(self, state, factory):
+        self.factories[state] = factory
+
+    def get_screen(self, state=None):
+        state = state or self.current_state
+        screen = self.screens.get(state)
+        if screen is None:
+            screen = self.factories[state]()
+            self.screens[state] = screen
+        return screen
+
+    def loaded_screen(self, state):
+        return self.screens.get(state)
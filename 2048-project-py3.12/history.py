@@ -0,0 +1,45 @@
+UNDO_MEMORY = 256 * 1024
+
+
+class History:
+    def __init__(self, record_size: int, max_bytes: int = UNDO_MEMORY):
+        self.record_size = record_size
+        self.capacity = max(1, max_bytes // record_size)
+        self.buffer = bytearray()
+        self.start = 0
+        self.length = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.buffer)
+
+    def push(self, record: bytes) -> None:
+        if len(record) != self.record_size:
+            raise ValueError(f"Record is {len(record)} bytes, not {self.record_size}")
+        if self.length == self.capacity:
+            self.start = (self.start + 1) % self.capacity
+            self.dropped += 1
+        else:
+            self.length += 1
+        slot = (self.start + self.length - 1) % self.capacity * self.record_size
+        if slot == len(self.buffer):
+            self.buffer += record
+        else:
+            self.buffer[slot : slot + self.record_size] = record
+
+    def pop(self) -> bytes:
+        if not self.length:
+            raise IndexError("pop from empty history")
+        self.length -= 1
+        slot = (self.start + self.length) % self.capacity * self.record_size
+        return bytes(self.buffer[slot : slot + self.record_size])
+
+    def clear(self) -> None:
+        self.buffer = bytearray()
+        self.start = 0
+        self.length = 0
+        self.dropped = 0
@@ -1,5 +1,13 @@
+import argparse
+import time
 import pygame
+from api_client import ApiClient
+from fonts import text_cache
+from game import GRID_SIZE, WIN_TILE
 from game_state_manager import GameStateManager
+from profiler import FrameProfiler
+from savegame import SaveFile
+from score_queue import ScoreQueue
 from screens import (
     StartScreen,
     GameScreen,
@@ -9,57 +17,238 @@ from screens import (
     ScoreSubmissionScreen,
 )
 
+WAKEUP_EVENT = pygame.event.custom_type()
+IDLE_POLL_MS = 10
+
+
+class FrameScheduler:
+    def __init__(
+        self,
+        game_state_manager,
+        idle_timeout_ms: int = 500,
+        profiler: FrameProfiler | None = None,
+    ):
+        self.game_state_manager = game_state_manager
+        self.idle_timeout_ms = idle_timeout_ms
+        self.profiler = profiler
+        self.clock = pygame.time.Clock()
+        self.stats: dict[str, dict[str, float]] = {}
+        self.first_frame: float | None = None
+
+    def wake(self) -> None:
+        pygame.event.post(pygame.event.Event(WAKEUP_EVENT))
+
+    def run_frame(self, name: str, screen) -> bool:
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+
+        running = screen.update()
+        cpu_time = time.thread_time() - cpu_start
+        if self.profiler:
+            if not hasattr(screen, "profiler"):
+                self.profiler.mark("render")
+            if self.profiler.overlay:
+                self.profiler.draw_overlay(pygame.display.get_surface())
+                self.profiler.mark("overlay")
+        if self.first_frame is None:
+            self.first_frame = time.perf_counter()
+        if self.game_state_manager.get_state() != name:
+            self.clock.tick()
+        elif screen.is_static():
+            self.wait_for_event()
+        else:
+            self.clock.tick(screen.target_fps)
+        if self.profiler:
+            self.profiler.mark("wait")
+
+        stats = self.stats.setdefault(
+            name, {"frames": 0, "cpu_time": 0.0, "wall_time": 0.0}
+        )
+        stats["frames"] += 1
+        stats["cpu_time"] += cpu_time
+        stats["wall_time"] += time.perf_counter() - wall_start
+        return running
+
+    def wait_for_event(self) -> None:
+        deadline = pygame.time.get_ticks() + self.idle_timeout_ms
+        while not pygame.event.peek() and pygame.time.get_ticks() < deadline:
+            pygame.time.wait(IDLE_POLL_MS)
+        pygame.event.clear(WAKEUP_EVENT)
+        self.clock.tick()
+
+    def report(self) -> str:
+        lines = [f"{'screen':<14}{'frames':>8}{'fps':>8}{'cpu s':>9}{'cpu %':>7}"]
+        for name, stats in self.stats.items():
+            wall = stats["wall_time"] or 1e-9
+            lines.append(
+                f"{name:<14}{stats['frames']:>8}"
+                f"{stats['frames'] / wall:>8.1f}"
+                f"{stats['cpu_time']:>9.2f}"
+                f"{100 * stats['cpu_time'] / wall:>7.1f}"
+            )
+        text = text_cache.stats()
+        lines.append(
+            f"text cache: {text['entries']} surfaces, {text['bytes'] / 1024:.0f} KiB,"
+            f" {text['hit_rate']:.1%} hits, {text['evictions']} evicted"
+        )
+        return "\n".join(lines)
+
+
+def handle_profiler_keys(profiler: FrameProfiler, screen) -> None:
+    for event in pygame.event.get(pygame.KEYDOWN):
+        if event.key == pygame.K_F3:
+            profiler.toggle_overlay()
+            if not profiler.overlay and hasattr(screen, "renderer"):
+                screen.renderer.invalidate()
+        elif event.key == pygame.K_F4:
+            written = profiler.toggle_capture()
+            if written:
+                print(f"Wrote profile to {written[0]} and trace to {written[1]}")
+        else:
+            pygame.event.post(event)
+
+
+class StartupProfile:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks: list[tuple[str, float]] = []
+
+    def mark(self, stage: str, at: float | None = None) -> None:
+        self.marks.append((stage, time.perf_counter() if at is None else at))
+
+    def report(self) -> str:
+        lines = [f"{'stage':<14}{'ms':>9}{'total ms':>10}"]
+        previous = self.start
+        for stage, at in self.marks:
+            lines.append(
+                f"{stage:<14}{1000 * (at - previous):>9.1f}"
+                f"{1000 * (at - self.start):>10.1f}"
+            )
+            previous = at
+        return "\n".join(lines)
+
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--grid-size", type=int, default=GRID_SIZE)
+    parser.add_argument("--win-tile", type=int, default=WIN_TILE)
+    parser.add_argument("--frame-stats", action="store_true")
+    parser.add_argument("--startup-profile", action="store_true")
+    parser.add_argument(
+        "--profiler", action="store_true", help="F3 toggles overlay, F4 cProfile"
+    )
+    args = parser.parse_args()
+    if not 2 <= args.grid_size <= 8:
+        parser.error("--grid-size must be between 2 and 8")
+    profile = StartupProfile() if args.startup_profile else None
+    profiler = FrameProfiler() if args.profiler else None
+
     pygame.init()
 
-    GRID_SIZE = 4
-    TILE_SIZE = 800 // GRID_SIZE
     WINDOW_WIDTH = 1000
     WINDOW_HEIGHT = 800
 
     screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
     pygame.display.set_caption("2048")
+    if profile:
+        profile.mark("display")
 
     game_state_manager = GameStateManager()
+    scheduler = FrameScheduler(game_state_manager, profiler=profiler)
+    client = ApiClient(on_result=scheduler.wake)
+    score_queue = ScoreQueue(client)
+    save_file = SaveFile()
+    if profile:
+        profile.mark("services")
+
+    def game_screen():
+        return GameScreen(
+            screen,
+            game_state_manager,
+            client,
+            args.grid_size,
+            args.win_tile,
+            save_file,
+            profiler,
+        )
 
-    start_screen = StartScreen(screen, game_state_manager)
-    game_screen = GameScreen(screen, game_state_manager, GRID_SIZE, TILE_SIZE)
-    end_screen = EndScreen(screen, game_state_manager)
-    win_screen = WinScreen(screen, game_state_manager)
-    leaderboard_screen = LeaderboardScreen(screen, game_state_manager)
-    score_submission_screen = ScoreSubmissionScreen(screen, game_state_manager)
+    def end_screen():
+        end = EndScreen(screen, game_state_manager)
+        end.set_game_screen(game_state_manager.get_screen("game"))
+        end.set_score_screen(game_state_manager.get_screen("submit_score"))
+        return end
 
-    end_screen.set_game_screen(game_screen)
-    end_screen.set_score_screen(score_submission_screen)
-    win_screen.set_game_screen(game_screen)
-    win_screen.set_score_screen(score_submission_screen)
-    score_submission_screen.set_game_screen(game_screen)
+    def win_screen():
+        win = WinScreen(screen, game_state_manager)
+        win.set_game_screen(game_state_manager.get_screen("game"))
+        win.set_score_screen(game_state_manager.get_screen("submit_score"))
+        return win
+
+    def score_submission_screen():
+        submission = ScoreSubmissionScreen(screen, game_state_manager, score_queue)
+        submission.set_game_screen(game_state_manager.get_screen("game"))
+        return submission
+
+    game_state_manager.register(
+        "start", lambda: StartScreen(screen, game_state_manager, score_queue)
+    )
+    game_state_manager.register("game", game_screen)
+    game_state_manager.register("end", end_screen)
+    game_state_manager.register("win", win_screen)
+    game_state_manager.register(
+        "leaderboard", lambda: LeaderboardScreen(screen, game_state_manager, client)
+    )
+    game_state_manager.register("submit_score", score_submission_screen)
+
+    snapshot = save_file.load()
+    if snapshot is not None and game_state_manager.get_screen("game").resume(snapshot):
+        game_state_manager.set_state("game")
+    if profile:
+        profile.mark("resume")
 
     previous_state = None
     running = True
 
     while running:
+        if profiler:
+            profiler.begin_frame()
+        client.poll()
         current_state = game_state_manager.get_state()
+        current_screen = game_state_manager.get_screen(current_state)
+        if profiler:
+            profiler.mark("poll")
+            handle_profiler_keys(profiler, current_screen)
 
         if current_state != previous_state:
             if current_state == "leaderboard":
-                leaderboard_screen.update_leaderboard()
+                current_screen.update_leaderboard()
+            elif current_state == "game":
+                current_screen.renderer.invalidate()
             previous_state = current_state
 
-        if current_state == "start":
-            running = start_screen.update()
-        elif current_state == "game":
-            running = game_screen.update()
-        elif current_state == "end":
-            running = end_screen.update()
-        elif current_state == "win":
-            running = win_screen.update()
-        elif current_state == "leaderboard":
-            running = leaderboard_screen.update()
-        elif current_state == "submit_score":
-            running = score_submission_screen.update()
+        running = scheduler.run_frame(current_state, current_screen)
+        if profiler:
+            profiler.end_frame()
+
+        if profile and scheduler.first_frame is not None:
+            profile.mark("first frame", scheduler.first_frame)
+            print(profile.report())
+            profile = None
+
+    if args.frame_stats:
+        print(scheduler.report())
+    if profiler and profiler.capture is not None:
+        written = profiler.toggle_capture()
+        print(f"Wrote profile to {written[0]} and trace to {written[1]}")
 
+    game_screen = game_state_manager.loaded_screen("game")
+    if game_screen is not None:
+        game_screen.close()
+        save_file.close(game_screen.game.snapshot())
+    else:
+        save_file.close()
+    score_queue.close()
+    client.close()
     pygame.quit()
 
 
@@ -0,0 +1,160 @@
+import cProfile
+import json
+import os
+import time
+from collections import deque
+
+import pygame
+
+from fonts import get_font
+
+HISTORY = 600
+OVERLAY_INTERVAL = 0.25
+PHASES = ("poll", "input", "logic", "render", "flip", "overlay", "wait")
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class FrameProfiler:
+    def __init__(self, history: int = HISTORY, directory: str = "."):
+        self.frames: deque[tuple[float, list[tuple[str, float, float]]]] = deque(
+            maxlen=history
+        )
+        self.directory = directory
+        self.spans: list[tuple[str, float, float]] = []
+        self.start = 0.0
+        self.last = 0.0
+        self.overlay = False
+        self.overlay_surface = None
+        self.overlay_at = 0.0
+        self.capture = None
+        self.captured: list[tuple[float, list[tuple[str, float, float]]]] = []
+
+    def begin_frame(self) -> None:
+        self.start = self.last = time.perf_counter()
+        self.spans = []
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.spans.append((phase, self.last, now))
+        self.last = now
+
+    def end_frame(self) -> None:
+        frame = (self.start, self.spans)
+        self.frames.append(frame)
+        if self.capture is not None:
+            self.captured.append(frame)
+
+    def summary(self) -> dict[str, float]:
+        frames = list(self.frames)
+        if not frames:
+            return {"fps": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+        busy = sorted(
+            sum(end - start for phase, start, end in spans if phase != "wait")
+            for _, spans in frames
+        )
+        elapsed = frames[-1][1][-1][2] - frames[0][0] if frames[-1][1] else 0.0
+        phases: dict[str, float] = {}
+        for _, spans in frames:
+            for phase, start, end in spans:
+                phases[phase] = phases.get(phase, 0.0) + end - start
+        summary = {
+            "fps": len(frames) / elapsed if elapsed > 0 else 0.0,
+            "p50": percentile(busy, 0.5) * 1000,
+            "p95": percentile(busy, 0.95) * 1000,
+            "p99": percentile(busy, 0.99) * 1000,
+        }
+        for phase, total in phases.items():
+            summary[phase] = total / len(frames) * 1000
+        return summary
+
+    def toggle_overlay(self) -> None:
+        self.overlay = not self.overlay
+        self.overlay_surface = None
+
+    def overlay_lines(self) -> list[str]:
+        summary = self.summary()
+        lines = [
+            f"{summary['fps']:.0f} fps",
+            f"p50 {summary['p50']:.1f}  p95 {summary['p95']:.1f}"
+            f"  p99 {summary['p99']:.1f} ms",
+        ]
+        for phase in PHASES:
+            if phase in summary:
+                lines.append(f"{phase:<7}{summary[phase]:>6.2f} ms")
+        if self.capture is not None:
+            lines.append(f"capturing ({len(self.captured)} frames)")
+        return lines
+
+    def draw_overlay(self, surface: pygame.Surface) -> None:
+        now = time.perf_counter()
+        if self.overlay_surface is None or now - self.overlay_at > OVERLAY_INTERVAL:
+            font = get_font(22)
+            lines = [
+                font.render(line, True, (255, 255, 255))
+                for line in self.overlay_lines()
+            ]
+            width = max(line.get_width() for line in lines) + 16
+            height = sum(line.get_height() for line in lines) + 12
+            overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+            overlay.fill((0, 0, 0, 170))
+            y = 6
+            for line in lines:
+                overlay.blit(line, (8, y))
+                y += line.get_height()
+            self.overlay_surface = overlay
+            self.overlay_at = now
+        rect = surface.blit(self.overlay_surface, (10, 10))
+        pygame.display.update(rect)
+
+    def toggle_capture(self) -> tuple[str, str] | None:
+        if self.capture is None:
+            self.captured = []
+            self.capture = cProfile.Profile()
+            self.capture.enable()
+            return None
+        self.capture.disable()
+        capture, self.capture = self.capture, None
+        name = os.path.join(self.directory, time.strftime("profile-%Y%m%d-%H%M%S"))
+        capture.dump_stats(name + ".prof")
+        self.write_trace(name + ".json", self.captured)
+        self.captured = []
+        return name + ".prof", name + ".json"
+
+    def write_trace(self, path: str, frames: list) -> None:
+        events = []
+        origin = frames[0][0] if frames else 0.0
+        for i, (start, spans) in enumerate(frames):
+            end = spans[-1][2] if spans else start
+            events.append(
+                {
+                    "name": "frame",
+                    "ph": "X",
+                    "ts": (start - origin) * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "pid": 0,
+                    "tid": 0,
+                    "args": {"frame": i},
+                }
+            )
+            for phase, span_start, span_end in spans:
+                events.append(
+                    {
+                        "name": phase,
+                        "ph": "X",
+                        "ts": (span_start - origin) * 1e6,
+                        "dur": (span_end - span_start) * 1e6,
+                        "pid": 0,
+                        "tid": 0,
+                    }
+                )
+        with open(path, "w") as f:
+            json.dump(
+                {"traceEvents": events, "displayTimeUnit": "ms"},
+                f,
+                separators=(",", ":"),
+            )
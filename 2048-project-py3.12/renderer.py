@@ -1,13 +1,24 @@
 import pygame
 
+from fonts import get_font, render_text
+
 
 class Renderer:
-    def __init__(self, screen: pygame.Surface, grid_size: int, tile_size: int):
+    def __init__(
+        self,
+        screen: pygame.Surface,
+        grid_size: int,
+        tile_size: int | None = None,
+        dirty_rects: bool = True,
+        profiler=None,
+    ):
         self.screen = screen
         self.grid_size = grid_size
-        self.tile_size = tile_size
-        self.grid_width = tile_size * grid_size
+        self.tile_size = tile_size or screen.get_height() // grid_size
+        self.grid_width = self.tile_size * grid_size
         self.score_panel_width = 200
+        self.dirty_rects = dirty_rects
+        self.profiler = profiler
         self.colors = {
             "background": (187, 173, 160),
             "score_panel": (170, 156, 143),
@@ -29,59 +40,168 @@ class Renderer:
             },
         }
         self.fonts = {
-            "score_label": pygame.font.Font(None, 36),
-            "score_value": pygame.font.Font(None, 48),
-            "tile": pygame.font.Font(None, 80),
+            "score_label": get_font(36),
+            "score_value": get_font(48),
+            "tile": get_font(self.tile_size * 2 // 5),
+            "status": get_font(28),
         }
-
-    def draw_game(self, game) -> None:
-        self.screen.fill(self.colors["background"])
-
-        pygame.draw.rect(
-            self.screen,
-            self.colors["score_panel"],
-            (self.grid_width, 0, self.score_panel_width, self.screen.get_height()),
+        self.panel_rect = pygame.Rect(
+            self.grid_width, 0, self.score_panel_width, screen.get_height()
         )
+        self.background = self.build_background()
+        self.tile_surfaces: dict[int, pygame.Surface] = {}
+        self.last_tiles: list[tuple] = []
+        self.last_panel = None
+        self.needs_full_redraw = True
+        self.stats = {"frames": 0, "frames_skipped": 0, "pixels_pushed": 0}
+
+    def invalidate(self) -> None:
+        self.needs_full_redraw = True
+
+    def build_background(self) -> pygame.Surface:
+        background = pygame.Surface(self.screen.get_size())
+        background.fill(self.colors["background"])
+        pygame.draw.rect(background, self.colors["score_panel"], self.panel_rect)
+        for row in range(self.grid_size):
+            for col in range(self.grid_size):
+                self.draw_cell(background, row, col)
+        return background
 
-        self.draw_scores(game.score, game.best_score)
-        self.draw_grid()
-
-        for tile in game.board.tiles.values():
-            self.draw_tile(tile)
+    def tile_surface(self, value: int) -> pygame.Surface:
+        surface = self.tile_surfaces.get(value)
+        if surface is not None:
+            return surface
 
+        size = self.tile_size - 8
+        color = self.colors["tiles"].get(value, self.colors["tiles"][2048])
+        text_color = (
+            self.colors["text_dark"] if value in [2, 4] else self.colors["text_light"]
+        )
+        surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.rect(surface, color, (0, 0, size, size), border_radius=8)
+        text = render_text(self.fonts["tile"], str(value), text_color)
+        if text.get_width() > size - 8:
+            width = size - 8
+            height = text.get_height() * width // text.get_width()
+            text = pygame.transform.smoothscale(text, (width, height))
+        surface.blit(text, text.get_rect(center=(size // 2, size // 2)))
+
+        self.tile_surfaces[value] = surface
+        return surface
+
+    def tile_rect(self, x: int, y: int, scale: float = 1.0) -> pygame.Rect:
+        size = int((self.tile_size - 8) * scale)
+        rect = pygame.Rect(0, 0, size, size)
+        rect.center = (x + self.tile_size // 2, y + self.tile_size // 2)
+        return rect
+
+    def blit_tile(self, value: int, x: int, y: int, scale: float) -> pygame.Rect:
+        rect = self.tile_rect(x, y, scale)
+        surface = self.tile_surface(value)
+        if scale != 1.0:
+            surface = pygame.transform.smoothscale(surface, rect.size)
+        self.screen.blit(surface, rect)
+        return rect
+
+    def draw_game(self, game, status: list[str] | None = None, ghosts=()) -> None:
+        tile_size = self.tile_size
+        tiles = [
+            (
+                tile.value,
+                int(tile.x * tile_size),
+                int(tile.y * tile_size),
+                round(tile.scale, 2),
+            )
+            for tile in (*ghosts, *game.board.tiles.values())
+            if tile.scale > 0
+        ]
+        best_score = "..." if game.best_score_pending else game.best_score
+        panel = (game.score, best_score, tuple(status or ()))
+
+        self.stats["frames"] += 1
+        if self.dirty_rects and not self.needs_full_redraw:
+            self.draw_changes(tiles, panel)
+        else:
+            self.draw_full(tiles, panel)
+
+        self.last_tiles = tiles
+        self.last_panel = panel
+
+    def draw_full(self, tiles: list[tuple], panel: tuple) -> None:
+        self.screen.blit(self.background, (0, 0))
+        self.draw_panel(panel)
+        for tile in tiles:
+            self.blit_tile(*tile)
+
+        if self.profiler:
+            self.profiler.mark("render")
         pygame.display.flip()
+        self.needs_full_redraw = False
+        self.stats["pixels_pushed"] += (
+            self.screen.get_width() * self.screen.get_height()
+        )
 
-    def draw_scores(self, score: int, best_score: int) -> None:
+    def draw_changes(self, tiles: list[tuple], panel: tuple) -> None:
+        changed = set(tiles).symmetric_difference(self.last_tiles)
+        rects = [self.tile_rect(x, y, scale) for _, x, y, scale in changed]
+        panel_changed = panel != self.last_panel
+        if not rects and not panel_changed:
+            self.stats["frames_skipped"] += 1
+            return
+
+        for rect in rects:
+            self.screen.blit(self.background, rect, rect)
+        for value, x, y, scale in tiles:
+            if self.tile_rect(x, y, scale).collidelist(rects) != -1:
+                self.blit_tile(value, x, y, scale)
+
+        if panel_changed:
+            self.screen.blit(self.background, self.panel_rect, self.panel_rect)
+            self.draw_panel(panel)
+            rects.append(self.panel_rect)
+
+        if self.profiler:
+            self.profiler.mark("render")
+        pygame.display.update(rects)
+        self.stats["pixels_pushed"] += sum(rect.width * rect.height for rect in rects)
+
+    def draw_panel(self, panel: tuple) -> None:
+        score, best_score, status = panel
+        self.draw_scores(score, best_score)
+        if status:
+            self.draw_status(status)
+
+    def draw_scores(self, score: int, best_score: int | str) -> None:
         score_x = self.grid_width + 20
 
-        score_label = self.fonts["score_label"].render(
-            "Score", True, self.colors["text_dark"]
+        score_label = render_text(
+            self.fonts["score_label"], "Score", self.colors["text_dark"]
         )
-        score_value = self.fonts["score_value"].render(
-            str(score), True, self.colors["text_light"]
+        score_value = render_text(
+            self.fonts["score_value"], str(score), self.colors["text_light"]
         )
 
         self.screen.blit(score_label, (score_x, 50))
         self.screen.blit(score_value, (score_x, 90))
 
-        best_label = self.fonts["score_label"].render(
-            "Best", True, self.colors["text_dark"]
+        best_label = render_text(
+            self.fonts["score_label"], "Best", self.colors["text_dark"]
         )
-        best_value = self.fonts["score_value"].render(
-            str(best_score), True, self.colors["text_light"]
+        best_value = render_text(
+            self.fonts["score_value"], str(best_score), self.colors["text_light"]
         )
 
         self.screen.blit(best_label, (score_x, 180))
         self.screen.blit(best_value, (score_x, 220))
 
-    def draw_grid(self) -> None:
-        for row in range(self.grid_size):
-            for col in range(self.grid_size):
-                self.draw_cell(row, col)
+    def draw_status(self, lines: list[str]) -> None:
+        for i, line in enumerate(lines):
+            text = render_text(self.fonts["status"], line, self.colors["text_light"])
+            self.screen.blit(text, (self.grid_width + 20, 320 + i * 30))
 
-    def draw_cell(self, row: int, col: int) -> None:
+    def draw_cell(self, surface: pygame.Surface, row: int, col: int) -> None:
         pygame.draw.rect(
-            self.screen,
+            surface,
             self.colors["empty_cell"],
             (
                 col * self.tile_size + 4,
@@ -91,24 +211,3 @@ class Renderer:
             ),
             border_radius=8,
         )
-
-    def draw_tile(self, tile) -> None:
-        color = self.colors["tiles"].get(tile.value, self.colors["tiles"][2048])
-        text_color = (
-            self.colors["text_dark"]
-            if tile.value in [2, 4]
-            else self.colors["text_light"]
-        )
-
-        pygame.draw.rect(
-            self.screen,
-            color,
-            (tile.x + 4, tile.y + 4, self.tile_size - 8, self.tile_size - 8),
-            border_radius=8,
-        )
-
-        text = self.fonts["tile"].render(str(tile.value), True, text_color)
-        text_rect = text.get_rect(
-            center=(tile.x + self.tile_size // 2, tile.y + self.tile_size // 2)
-        )
-        self.screen.blit(text, text_rect)
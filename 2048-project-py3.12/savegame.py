@@ -0,0 +1,69 @@
+import os
+import threading
+
+SAVE_FILE = os.environ.get("GAME_SAVE_FILE", "savegame.bin")
+SAVE_INTERVAL = 2.0
+
+
+class SaveFile:
+    def __init__(self, path: str = SAVE_FILE, interval: float = SAVE_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.closing = threading.Event()
+        self.pending: bytes | None = None
+        self.writes = 0
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+
+    def load(self) -> bytes | None:
+        try:
+            with open(self.path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def save(self, data: bytes) -> None:
+        with self.lock:
+            self.pending = data
+        self.wakeup.set()
+
+    def flush(self) -> None:
+        with self.write_lock:
+            with self.lock:
+                data, self.pending = self.pending, None
+            if data is None:
+                return
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self.writes += 1
+
+    def _write_loop(self) -> None:
+        while True:
+            self.wakeup.wait()
+            self.wakeup.clear()
+            if self.closing.is_set():
+                return
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"Failed to save game: {e}")
+            if self.closing.wait(self.interval):
+                return
+
+    def close(self, data: bytes | None = None) -> None:
+        if data is not None:
+            self.save(data)
+        self.closing.set()
+        self.wakeup.set()
+        self.writer.join()
+        try:
+            self.flush()
+        except OSError as e:
+            print(f"Failed to save game: {e}")
@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+import uuid
+
+from api_client import ApiClient
+
+QUEUE_FILE = os.environ.get("GAME_QUEUE_FILE", "score_queue.jsonl")
+BATCH_SIZE = 50
+FLUSH_INTERVAL = 5.0
+MAX_BACKOFF = 60.0
+
+
+class ScoreQueue:
+    def __init__(
+        self,
+        client: ApiClient,
+        path: str = QUEUE_FILE,
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+    ):
+        self.client = client
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopping = False
+        self.pending: list[dict] = self.load()
+        self.uploaded = 0
+        self.failures = 0
+        self.flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self.flusher.start()
+
+    @property
+    def depth(self) -> int:
+        return len(self.pending)
+
+    def load(self) -> list[dict]:
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return entries
+
+    def enqueue(self, name: str, score: int, replay: dict | None = None) -> dict:
+        entry = {"id": uuid.uuid4().hex, "name": name, "score": score}
+        if replay is not None:
+            entry["replay"] = replay
+        with self.lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.pending.append(entry)
+        self.wakeup.set()
+        return entry
+
+    def flush(self) -> bool:
+        while True:
+            with self.lock:
+                batch = self.pending[: self.batch_size]
+            if not batch:
+                return True
+            response = self.client.request(
+                "POST", "/submit-scores/", json={"scores": batch}
+            )
+            if not response.ok:
+                return False
+            self._acknowledge({entry["id"] for entry in batch})
+
+    def _acknowledge(self, ids: set[str]) -> None:
+        with self.lock:
+            self.pending = [e for e in self.pending if e["id"] not in ids]
+            self.uploaded += len(ids)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w") as f:
+                for entry in self.pending:
+                    f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+
+    def _flush_loop(self) -> None:
+        delay = self.flush_interval
+        while not self.stopping:
+            self.wakeup.wait(delay)
+            self.wakeup.clear()
+            if self.stopping:
+                return
+            if self.flush():
+                self.failures = 0
+                delay = self.flush_interval
+            else:
+                self.failures += 1
+                delay = min(self.flush_interval * 2**self.failures, MAX_BACKOFF)
+
+    def close(self) -> None:
+        self.stopping = True
+        self.wakeup.set()
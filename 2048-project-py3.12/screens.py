@@ -1,43 +1,95 @@
+import time
+from collections import deque
 import pygame
-from game import Game
+from ai import ExpectimaxSolver
+from animation import Animator
+from api_client import ApiClient, ApiResponse, ServerEvent
+from fonts import get_font, render_text
+from game import GRID_SIZE, WIN_TILE, Game
+from profiler import FrameProfiler
 from renderer import Renderer
-import requests
+from savegame import SaveFile
+from score_queue import ScoreQueue
+
+
+class StaticLayer:
+    def __init__(self, size: tuple[int, int]):
+        self.surface = pygame.Surface(size)
+        self.key = None
+        self.builds = 0
+
+    def render(self, key, draw) -> pygame.Surface:
+        if self.builds == 0 or key != self.key:
+            draw(self.surface)
+            self.key = key
+            self.builds += 1
+        return self.surface
 
 
 class StartScreen:
-    def __init__(self, display: pygame.Surface, game_state_manager):
+    target_fps = 30
+
+    def __init__(
+        self,
+        display: pygame.Surface,
+        game_state_manager,
+        score_queue: ScoreQueue | None = None,
+    ):
         self.display = display
         self.game_state_manager = game_state_manager
+        self.score_queue = score_queue
+        self.layer = StaticLayer(display.get_size())
         self.background_color = (237, 194, 46)
         self.text_color = (119, 110, 101)
 
-        self.font_large = pygame.font.Font(None, 60)
-        self.font_medium = pygame.font.Font(None, 40)
+        self.font_large = get_font(60)
+        self.font_medium = get_font(40)
+        self.font_small = get_font(24)
 
-        self.title = self.font_large.render("2048", True, self.text_color)
+        self.title = render_text(self.font_large, "2048", self.text_color)
         self.title_rect = self.title.get_rect(
             center=(self.display.get_width() // 2, self.display.get_height() // 3)
         )
 
-        self.play_text = self.font_medium.render(
-            "Press SPACE to Play", True, self.text_color
+        self.play_text = render_text(
+            self.font_medium, "Press SPACE to Play", self.text_color
         )
         self.play_rect = self.play_text.get_rect(
             center=(self.display.get_width() // 2, self.display.get_height() // 2)
         )
 
-        self.leaderboard_text = self.font_medium.render(
-            "Press L for Leaderboard", True, self.text_color
+        self.leaderboard_text = render_text(
+            self.font_medium, "Press L for Leaderboard", self.text_color
         )
         self.leaderboard_rect = self.leaderboard_text.get_rect(
             center=(self.display.get_width() // 2, self.display.get_height() // 2 + 60)
         )
 
+    def is_static(self) -> bool:
+        return True
+
+    def draw(self, surface: pygame.Surface) -> None:
+        surface.fill(self.background_color)
+        surface.blit(self.title, self.title_rect)
+        surface.blit(self.play_text, self.play_rect)
+        surface.blit(self.leaderboard_text, self.leaderboard_rect)
+        depth = self.queued_scores()
+        if depth:
+            queued = render_text(
+                self.font_small,
+                f"{depth} score(s) waiting to upload",
+                self.text_color,
+            )
+            queued_rect = queued.get_rect(
+                center=(surface.get_width() // 2, surface.get_height() - 30)
+            )
+            surface.blit(queued, queued_rect)
+
+    def queued_scores(self) -> int:
+        return self.score_queue.depth if self.score_queue is not None else 0
+
     def update(self) -> bool:
-        self.display.fill(self.background_color)
-        self.display.blit(self.title, self.title_rect)
-        self.display.blit(self.play_text, self.play_rect)
-        self.display.blit(self.leaderboard_text, self.leaderboard_rect)
+        self.display.blit(self.layer.render(self.queued_scores(), self.draw), (0, 0))
         pygame.display.flip()
 
         for event in pygame.event.get():
@@ -52,78 +104,219 @@ class StartScreen:
 
 
 class GameScreen:
+    target_fps = 60
+    max_queued_moves = 4
+
     def __init__(
         self,
         display: pygame.Surface,
         game_state_manager,
-        grid_size: int,
-        tile_size: int,
+        client: ApiClient,
+        grid_size: int = GRID_SIZE,
+        win_tile: int = WIN_TILE,
+        save_file: SaveFile | None = None,
+        profiler: FrameProfiler | None = None,
     ):
         self.display = display
         self.game_state_manager = game_state_manager
-        self.game = Game()
-        self.renderer = Renderer(display, grid_size, tile_size)
-        self.clock = pygame.time.Clock()
+        self.save_file = save_file
+        self.profiler = profiler
+        self.game = Game(client, grid_size=grid_size, win_tile=win_tile)
+        self.renderer = Renderer(display, grid_size, profiler=profiler)
+        self.animator = Animator()
+        self.move_queue: deque[str] = deque(maxlen=self.max_queued_moves)
+        self.turn_pending = False
+        self.solver = None
+        self.search = None
+        self.search_board = None
+        self.autoplay = False
+        self.hint = None
 
     def reset_game(self) -> None:
+        self.animator.finish()
+        self.move_queue.clear()
+        self.turn_pending = False
         self.game.reset()
+        self.hint = None
+        self.save_game()
+
+    def save_game(self) -> None:
+        if self.save_file is not None:
+            self.save_file.save(self.game.snapshot())
+
+    def resume(self, data: bytes) -> bool:
+        game = self.game
+        grid_size, win_tile = game.grid_size, game.win_tile
+        try:
+            game.load_snapshot(data)
+        except ValueError as e:
+            print(f"Ignoring saved game: {e}")
+            return False
+        if (game.grid_size, game.win_tile) == (grid_size, win_tile):
+            if not game.is_game_over():
+                return True
+        game.grid_size, game.win_tile = grid_size, win_tile
+        game.reset()
+        return False
+
+    def busy(self) -> bool:
+        return self.animator.active or bool(self.move_queue)
+
+    def request_search(self) -> None:
+        if self.search is not None:
+            return
+        try:
+            board = self.game.to_bitboard()
+        except ValueError:
+            self.autoplay = False
+            return
+        if self.solver is None:
+            self.solver = ExpectimaxSolver(time_budget=0.5)
+        self.search_board = board
+        self.search = self.solver.submit(board)
+
+    def poll_search(self) -> None:
+        if self.search is None or not self.search.done():
+            return
+        search, self.search = self.search, None
+        if search.exception() is not None:
+            self.autoplay = False
+            return
+        direction = search.result()
+        if self.move_queue or self.game.to_bitboard() != self.search_board:
+            return
+        if self.autoplay:
+            if direction is None:
+                self.autoplay = False
+            else:
+                self.move_queue.append(direction)
+        else:
+            self.hint = direction
+
+    def status_lines(self) -> list[str]:
+        lines = [f"Auto-play: {'on' if self.autoplay else 'off'} (A)"]
+        if self.autoplay:
+            return lines
+        if self.search is not None:
+            lines.append("Hint: thinking...")
+        elif self.hint is not None:
+            lines.append(f"Hint: {self.hint.upper()}")
+        else:
+            lines.append("Hint: press H")
+        return lines
+
+    def undo(self) -> bool:
+        self.animator.finish()
+        self.move_queue.clear()
+        self.autoplay = False
+        self.turn_pending = False
+        if not self.game.undo():
+            return False
+        self.save_game()
+        return True
+
+    def redo(self) -> bool:
+        self.animator.finish()
+        self.move_queue.clear()
+        if not self.game.redo():
+            return False
+        self.animator.start(self.game.last_turn, time.monotonic())
+        self.turn_pending = True
+        self.save_game()
+        return True
+
+    def close(self) -> None:
+        if self.solver is not None:
+            self.solver.close()
+
+    def is_static(self) -> bool:
+        return not (self.busy() or self.autoplay or self.search is not None)
 
     def handle_input(self) -> bool:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
 
-            if event.type == pygame.KEYDOWN and not self.game.moving:
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_a:
+                    self.autoplay = not self.autoplay
+                    self.hint = None
+                    continue
+                self.hint = None
                 if event.key == pygame.K_r:
-                    self.game.reset()
+                    self.reset_game()
+                elif event.key == pygame.K_h:
+                    self.request_search()
+                elif event.key == pygame.K_u:
+                    self.undo()
+                elif event.key == pygame.K_y:
+                    self.redo()
                 elif event.key == pygame.K_LEFT:
-                    self.game.process_movement("left")
+                    self.move_queue.append("left")
                 elif event.key == pygame.K_RIGHT:
-                    self.game.process_movement("right")
+                    self.move_queue.append("right")
                 elif event.key == pygame.K_UP:
-                    self.game.process_movement("up")
+                    self.move_queue.append("up")
                 elif event.key == pygame.K_DOWN:
-                    self.game.process_movement("down")
+                    self.move_queue.append("down")
 
         return True
 
+    def apply_queued_move(self, now: float) -> None:
+        while self.move_queue:
+            direction = self.move_queue.popleft()
+            self.animator.finish()
+            if self.game.process_movement(direction):
+                self.animator.start(self.game.last_turn, now)
+                self.turn_pending = True
+                self.save_game()
+                return
+
     def update(self) -> bool:
         if not self.handle_input():
             return False
-
-        if self.game.moving:
-            self.game.update()
-
-            if not self.game.moving:
-                if self.game.win and not self.game.has_shown_win:
-                    self.game_state_manager.set_state("win")
-                    self.game.has_shown_win = True
-                elif self.game.is_game_over():
-                    self.game_state_manager.set_state("end")
-
-        self.renderer.draw_game(self.game)
-        self.clock.tick(60)
+        if self.profiler:
+            self.profiler.mark("input")
+
+        now = time.monotonic()
+        self.poll_search()
+        self.apply_queued_move(now)
+        self.animator.update(now)
+
+        if self.turn_pending and not self.busy():
+            self.turn_pending = False
+            if self.game.win and not self.game.has_shown_win:
+                self.game_state_manager.set_state("win")
+                self.game.has_shown_win = True
+            elif self.game.is_game_over():
+                self.game_state_manager.set_state("end")
+
+        if self.autoplay and not self.busy():
+            self.request_search()
+        if self.profiler:
+            self.profiler.mark("logic")
+
+        self.renderer.draw_game(self.game, self.status_lines(), self.animator.ghosts)
+        if self.profiler:
+            self.profiler.mark("flip")
 
         return True
 
 
 class EndScreen:
+    target_fps = 30
+
     def __init__(self, display: pygame.Surface, game_state_manager):
         self.display = display
         self.game_state_manager = game_state_manager
         self.game_screen = None
         self.score_screen = None
-        self.font = pygame.font.Font(None, 60)
-        self.text = self.font.render("Game Over!", True, (255, 255, 255))
+        self.font = get_font(60)
+        self.layer = StaticLayer(display.get_size())
+        self.text = render_text(self.font, "Game Over!", (255, 255, 255))
         self.text_rect = self.text.get_rect(
             center=(self.display.get_width() // 2, self.display.get_height() // 2 - 50)
         )
-        self.instruction = pygame.font.Font(None, 36).render(
-            "Press ENTER to submit score or R to restart", True, (255, 255, 255)
-        )
-        self.instruction_rect = self.instruction.get_rect(
-            center=(self.display.get_width() // 2, self.display.get_height() // 2 + 50)
-        )
 
     def set_game_screen(self, game_screen) -> None:
         self.game_screen = game_screen
@@ -131,10 +324,32 @@ class EndScreen:
     def set_score_screen(self, score_screen) -> None:
         self.score_screen = score_screen
 
+    def is_static(self) -> bool:
+        return True
+
+    def can_submit(self) -> bool:
+        return (
+            self.score_screen is not None
+            and self.game_screen is not None
+            and self.game_screen.game.submittable
+        )
+
+    def draw(self, surface: pygame.Surface) -> None:
+        surface.fill((150, 20, 20))
+        surface.blit(self.text, self.text_rect)
+        options = "U to undo or R to restart"
+        if self.can_submit():
+            options = "ENTER to submit score, " + options
+        instruction = render_text(get_font(36), "Press " + options, (255, 255, 255))
+        surface.blit(
+            instruction,
+            instruction.get_rect(
+                center=(surface.get_width() // 2, surface.get_height() // 2 + 50)
+            ),
+        )
+
     def update(self) -> bool:
-        self.display.fill((150, 20, 20))
-        self.display.blit(self.text, self.text_rect)
-        self.display.blit(self.instruction, self.instruction_rect)
+        self.display.blit(self.layer.render(self.can_submit(), self.draw), (0, 0))
         pygame.display.flip()
 
         for event in pygame.event.get():
@@ -145,32 +360,33 @@ class EndScreen:
                     if self.game_screen:
                         self.game_screen.reset_game()
                     self.game_state_manager.set_state("game")
+                elif event.key == pygame.K_u:
+                    if self.game_screen and self.game_screen.undo():
+                        self.game_state_manager.set_state("game")
                 elif event.key == pygame.K_RETURN:
-                    if self.score_screen and self.game_screen:
-                        self.score_screen.set_score(self.game_screen.game.score)
+                    if self.can_submit():
+                        self.score_screen.set_score(
+                            self.game_screen.game.score,
+                            self.game_screen.game.replay(),
+                        )
                         self.game_state_manager.set_state("submit_score")
         return True
 
 
 class WinScreen:
+    target_fps = 30
+
     def __init__(self, display: pygame.Surface, game_state_manager):
         self.display = display
         self.game_state_manager = game_state_manager
         self.game_screen = None
         self.score_screen = None
-        self.font = pygame.font.Font(None, 60)
-        self.text = self.font.render("You Won!", True, (255, 255, 255))
+        self.font = get_font(60)
+        self.layer = StaticLayer(display.get_size())
+        self.text = render_text(self.font, "You Won!", (255, 255, 255))
         self.text_rect = self.text.get_rect(
             center=(self.display.get_width() // 2, self.display.get_height() // 2 - 50)
         )
-        self.instruction = pygame.font.Font(None, 36).render(
-            "Press ENTER to submit score, C to continue, R to restart, or ESC for menu",
-            True,
-            (255, 255, 255),
-        )
-        self.instruction_rect = self.instruction.get_rect(
-            center=(self.display.get_width() // 2, self.display.get_height() // 2 + 50)
-        )
 
     def set_game_screen(self, game_screen) -> None:
         self.game_screen = game_screen
@@ -178,10 +394,32 @@ class WinScreen:
     def set_score_screen(self, score_screen) -> None:
         self.score_screen = score_screen
 
+    def is_static(self) -> bool:
+        return True
+
+    def can_submit(self) -> bool:
+        return (
+            self.score_screen is not None
+            and self.game_screen is not None
+            and self.game_screen.game.submittable
+        )
+
+    def draw(self, surface: pygame.Surface) -> None:
+        surface.fill((50, 150, 50))
+        surface.blit(self.text, self.text_rect)
+        options = "C to continue, R to restart, or ESC for menu"
+        if self.can_submit():
+            options = "ENTER to submit score, " + options
+        instruction = render_text(get_font(36), "Press " + options, (255, 255, 255))
+        surface.blit(
+            instruction,
+            instruction.get_rect(
+                center=(surface.get_width() // 2, surface.get_height() // 2 + 50)
+            ),
+        )
+
     def update(self) -> bool:
-        self.display.fill((50, 150, 50))
-        self.display.blit(self.text, self.text_rect)
-        self.display.blit(self.instruction, self.instruction_rect)
+        self.display.blit(self.layer.render(self.can_submit(), self.draw), (0, 0))
         pygame.display.flip()
 
         for event in pygame.event.get():
@@ -195,8 +433,11 @@ class WinScreen:
                 elif event.key == pygame.K_c:
                     self.game_state_manager.set_state("game")
                 elif event.key == pygame.K_RETURN:
-                    if self.score_screen and self.game_screen:
-                        self.score_screen.set_score(self.game_screen.game.score)
+                    if self.can_submit():
+                        self.score_screen.set_score(
+                            self.game_screen.game.score,
+                            self.game_screen.game.replay(),
+                        )
                         self.game_state_manager.set_state("submit_score")
                 elif event.key == pygame.K_ESCAPE:
                     if self.game_screen:
@@ -206,13 +447,21 @@ class WinScreen:
 
 
 class LeaderboardScreen:
-    def __init__(self, display: pygame.Surface, game_state_manager):
+    target_fps = 30
+    top_n = 10
+
+    def __init__(self, display: pygame.Surface, game_state_manager, client: ApiClient):
         self.display = display
         self.game_state_manager = game_state_manager
-        self.font_title = pygame.font.Font(None, 60)
-        self.font_scores = pygame.font.Font(None, 36)
-        self.font_instructions = pygame.font.Font(None, 24)
+        self.client = client
+        self.loading = False
+        self.font_title = get_font(60)
+        self.font_scores = get_font(36)
+        self.font_instructions = get_font(24)
+        self.layer = StaticLayer(display.get_size())
         self.leaderboard = []
+        self.etag = None
+        self.stream = None
         self.error_message = None
         self.colors = {
             "background": (70, 130, 180),
@@ -221,87 +470,135 @@ class LeaderboardScreen:
             "instructions": (200, 200, 200),
             "error": (255, 100, 100),
         }
-        self.update_leaderboard()
 
     def update_leaderboard(self) -> None:
-        try:
-            response = requests.get("http://127.0.0.1:8000/get-leaderboard/", timeout=5)
-            if response.status_code == 200:
-                self.leaderboard = response.json()
-                self.error_message = None
-            else:
-                self.error_message = f"Server error: {response.status_code}"
-        except requests.RequestException:
+        if self.loading:
+            return
+        self.loading = True
+        headers = {"If-None-Match": self.etag} if self.etag else None
+        self.client.get("/get-leaderboard/", self.on_leaderboard, headers=headers)
+
+    def on_leaderboard(self, response: ApiResponse) -> None:
+        self.loading = False
+        if response.status == 304:
+            self.error_message = None
+        elif response.ok:
+            self.leaderboard = response.data
+            self.etag = response.headers.get("ETag")
+            self.error_message = None
+        elif response.status is not None:
+            self.error_message = f"Server error: {response.status}"
+            return
+        else:
             self.error_message = "Cannot connect to server. Is it running?"
+            return
+        if self.stream is None:
+            version = self.etag.removeprefix("W/").strip('"') if self.etag else None
+            self.stream = self.client.stream(
+                "/leaderboard-stream/", self.on_event, last_event_id=version
+            )
+
+    def on_event(self, event: ServerEvent) -> None:
+        if event.name == "snapshot":
+            self.leaderboard = event.data
+        elif event.name == "insert":
+            for entry in event.data["inserted"]:
+                self.leaderboard.insert(
+                    entry["rank"] - 1, {"name": entry["name"], "score": entry["score"]}
+                )
+            del self.leaderboard[self.top_n :]
+        if event.id is not None:
+            self.etag = f'W/"{event.id}"'
+
+    def close_stream(self) -> None:
+        if self.stream is not None:
+            self.client.close_stream(self.stream)
+            self.stream = None
+
+    def layer_key(self) -> tuple:
+        entries = tuple(
+            (entry.get("name", "Unknown"), entry.get("score", 0))
+            for entry in self.leaderboard[: self.top_n]
+        )
+        return self.error_message, self.loading, entries
+
+    def draw(self, surface: pygame.Surface) -> None:
+        surface.fill(self.colors["background"])
+        self.draw_header(surface)
+        self.draw_scores(surface)
+        self.draw_instructions(surface)
 
-    def draw_header(self) -> None:
-        title = self.font_title.render("Leaderboard", True, self.colors["text"])
-        title_rect = title.get_rect(center=(self.display.get_width() // 2, 50))
-        self.display.blit(title, title_rect)
+    def draw_header(self, surface: pygame.Surface) -> None:
+        title = render_text(self.font_title, "Leaderboard", self.colors["text"])
+        title_rect = title.get_rect(center=(surface.get_width() // 2, 50))
+        surface.blit(title, title_rect)
 
         if not self.error_message:
             headers = ["Rank", "Player", "Score"]
             header_widths = [100, 200, 150]
             start_x = 50
             for header, width in zip(headers, header_widths):
-                text = self.font_scores.render(header, True, self.colors["highlight"])
-                self.display.blit(text, (start_x, 120))
+                text = render_text(self.font_scores, header, self.colors["highlight"])
+                surface.blit(text, (start_x, 120))
                 start_x += width
 
-    def draw_scores(self) -> None:
+    def draw_scores(self, surface: pygame.Surface) -> None:
         if self.error_message:
-            error_text = self.font_scores.render(
-                self.error_message, True, self.colors["error"]
+            error_text = render_text(
+                self.font_scores, self.error_message, self.colors["error"]
             )
-            error_rect = error_text.get_rect(
-                center=(self.display.get_width() // 2, 200)
-            )
-            self.display.blit(error_text, error_rect)
+            error_rect = error_text.get_rect(center=(surface.get_width() // 2, 200))
+            surface.blit(error_text, error_rect)
 
-            retry_text = self.font_instructions.render(
-                "Press R to retry", True, self.colors["text"]
-            )
-            retry_rect = retry_text.get_rect(
-                center=(self.display.get_width() // 2, 250)
+            retry_text = render_text(
+                self.font_instructions, "Press R to retry", self.colors["text"]
             )
-            self.display.blit(retry_text, retry_rect)
+            retry_rect = retry_text.get_rect(center=(surface.get_width() // 2, 250))
+            surface.blit(retry_text, retry_rect)
             return
 
         start_y = 180
         line_height = 40
 
         if not self.leaderboard:
-            no_scores = self.font_scores.render(
-                "No scores yet!", True, self.colors["text"]
+            no_scores = render_text(
+                self.font_scores,
+                "Loading..." if self.loading else "No scores yet!",
+                self.colors["text"],
             )
             no_scores_rect = no_scores.get_rect(
-                center=(self.display.get_width() // 2, start_y)
+                center=(surface.get_width() // 2, start_y)
             )
-            self.display.blit(no_scores, no_scores_rect)
+            surface.blit(no_scores, no_scores_rect)
             return
 
-        for i, entry in enumerate(self.leaderboard[:10]):
+        for i, entry in enumerate(self.leaderboard[: self.top_n]):
             y_pos = start_y + i * line_height
 
-            rank_text = self.font_scores.render(f"#{i+1}", True, self.colors["text"])
-            self.display.blit(rank_text, (50, y_pos))
+            rank_text = render_text(self.font_scores, f"#{i+1}", self.colors["text"])
+            surface.blit(rank_text, (50, y_pos))
 
             name = entry.get("name", "Unknown")
-            name_text = self.font_scores.render(name, True, self.colors["text"])
-            self.display.blit(name_text, (150, y_pos))
+            name_text = render_text(self.font_scores, name, self.colors["text"])
+            surface.blit(name_text, (150, y_pos))
 
             score = entry.get("score", 0)
-            score_text = self.font_scores.render(f"{score}", True, self.colors["text"])
-            self.display.blit(score_text, (350, y_pos))
-
-    def draw_instructions(self) -> None:
-        instructions = self.font_instructions.render(
-            "Press ESC to return to menu", True, self.colors["instructions"]
+            score_text = render_text(self.font_scores, f"{score}", self.colors["text"])
+            surface.blit(score_text, (350, y_pos))
+
+    def draw_instructions(self, surface: pygame.Surface) -> None:
+        instructions = render_text(
+            self.font_instructions,
+            "Press ESC to return to menu",
+            self.colors["instructions"],
         )
         instructions_rect = instructions.get_rect(
-            center=(self.display.get_width() // 2, self.display.get_height() - 30)
+            center=(surface.get_width() // 2, surface.get_height() - 30)
         )
-        self.display.blit(instructions, instructions_rect)
+        surface.blit(instructions, instructions_rect)
+
+    def is_static(self) -> bool:
+        return True
 
     def update(self) -> bool:
         for event in pygame.event.get():
@@ -309,27 +606,33 @@ class LeaderboardScreen:
                 return False
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
+                    self.close_stream()
                     self.game_state_manager.set_state("start")
                 elif event.key == pygame.K_r and self.error_message:
                     self.update_leaderboard()
 
-        self.display.fill(self.colors["background"])
-        self.draw_header()
-        self.draw_scores()
-        self.draw_instructions()
+        self.display.blit(self.layer.render(self.layer_key(), self.draw), (0, 0))
         pygame.display.flip()
 
         return True
 
 
 class ScoreSubmissionScreen:
-    def __init__(self, display: pygame.Surface, game_state_manager):
+    target_fps = 30
+
+    def __init__(
+        self, display: pygame.Surface, game_state_manager, score_queue: ScoreQueue
+    ):
         self.display = display
         self.game_state_manager = game_state_manager
+        self.score_queue = score_queue
         self.game_screen = None
-        self.font = pygame.font.Font(None, 48)
+        self.font = get_font(48)
+        self.font_instructions = get_font(36)
+        self.layer = StaticLayer(display.get_size())
         self.name = ""
         self.score = 0
+        self.replay = None
         self.error_message = None
         self.colors = {
             "background": (70, 130, 180),
@@ -341,27 +644,60 @@ class ScoreSubmissionScreen:
     def set_game_screen(self, game_screen) -> None:
         self.game_screen = game_screen
 
-    def set_score(self, score: int) -> None:
+    def set_score(self, score: int, replay: dict | None = None) -> None:
         self.score = score
+        self.replay = replay
+
+    def is_static(self) -> bool:
+        return True
+
+    def layer_key(self) -> tuple:
+        return self.score, self.name, self.error_message
+
+    def draw(self, surface: pygame.Surface) -> None:
+        surface.fill(self.colors["background"])
+        center_x = surface.get_width() // 2
+
+        score_text = render_text(
+            self.font, f"Your Score: {self.score}", self.colors["text"]
+        )
+        surface.blit(score_text, score_text.get_rect(center=(center_x, 100)))
+
+        prompt = render_text(self.font, "Enter your name:", self.colors["text"])
+        surface.blit(prompt, prompt.get_rect(center=(center_x, 200)))
+
+        input_text = render_text(self.font, f"{self.name}_", self.colors["input"])
+        surface.blit(input_text, input_text.get_rect(center=(center_x, 300)))
+
+        instructions = render_text(
+            self.font_instructions,
+            "Press ENTER to submit or ESC to cancel",
+            self.colors["text"],
+        )
+        surface.blit(instructions, instructions.get_rect(center=(center_x, 400)))
+
+        if self.error_message:
+            error_text = render_text(
+                self.font, self.error_message, self.colors["error"]
+            )
+            surface.blit(error_text, error_text.get_rect(center=(center_x, 500)))
 
     def submit_score(self) -> None:
         if not self.name:
             return
 
         try:
-            response = requests.post(
-                "http://localhost:8000/submit-score/",
-                json={"name": self.name, "score": self.score},
-            )
-            print(f"Score submission response: {response.status_code}")
-            if response.status_code == 200:
-                print("Score submitted successfully")
-                if self.game_screen:
-                    self.game_screen.reset_game()
-                self.game_state_manager.set_state("start")
-        except requests.RequestException as e:
-            self.error_message = "Failed to submit score. Is the server running?"
-            print(f"Failed to submit score: {e}")
+            self.score_queue.enqueue(self.name, self.score, self.replay)
+        except OSError as e:
+            self.error_message = "Failed to save score."
+            print(f"Failed to queue score: {e}")
+            return
+
+        print(f"Score queued for upload ({self.score_queue.depth} pending)")
+        self.error_message = None
+        if self.game_screen:
+            self.game_screen.reset_game()
+        self.game_state_manager.set_state("start")
 
     def update(self) -> bool:
         for event in pygame.event.get():
@@ -379,29 +715,6 @@ class ScoreSubmissionScreen:
                 elif len(self.name) < 15 and event.unicode.isalnum():
                     self.name += event.unicode
 
-        self.display.fill(self.colors["background"])
-
-        score_text = self.font.render(
-            f"Your Score: {self.score}", True, self.colors["text"]
-        )
-        score_rect = score_text.get_rect(center=(self.display.get_width() // 2, 100))
-        self.display.blit(score_text, score_rect)
-
-        prompt = self.font.render("Enter your name:", True, self.colors["text"])
-        prompt_rect = prompt.get_rect(center=(self.display.get_width() // 2, 200))
-        self.display.blit(prompt, prompt_rect)
-
-        input_text = self.font.render(f"{self.name}_", True, self.colors["input"])
-        input_rect = input_text.get_rect(center=(self.display.get_width() // 2, 300))
-        self.display.blit(input_text, input_rect)
-
-        instructions = pygame.font.Font(None, 36).render(
-            "Press ENTER to submit or ESC to cancel", True, self.colors["text"]
-        )
-        instructions_rect = instructions.get_rect(
-            center=(self.display.get_width() // 2, 400)
-        )
-        self.display.blit(instructions, instructions_rect)
-
+        self.display.blit(self.layer.render(self.layer_key(), self.draw), (0, 0))
         pygame.display.flip()
         return True
@@ -0,0 +1,130 @@
+import importlib.util
+import os
+import random
+import sys
+import tempfile
+import unittest
+from bisect import bisect_left, bisect_right
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from leaderboard import Leaderboard  # noqa: E402
+from live import LiveLeaderboard  # noqa: E402
+from stats import RELATIVE_ACCURACY  # noqa: E402
+from store import ScoreStore  # noqa: E402
+from verifier import ReplayVerifier  # noqa: E402
+
+
+def load_backend(directory: str):
+    spec = importlib.util.spec_from_file_location(
+        "backend_main", os.path.join(BACKEND_DIR, "main.py")
+    )
+    backend = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(backend)
+    backend.store = ScoreStore(os.path.join(directory, "test.db"))
+    backend.leaderboard = Leaderboard(backend.store)
+    backend.live = LiveLeaderboard(backend.leaderboard)
+    backend.verifier = ReplayVerifier(workers=0)
+    backend.LEADERBOARD_FILE = os.path.join(directory, "leaderboard.json")
+    backend.REQUIRE_REPLAY = False
+    backend.metrics.directory = os.path.join(directory, "metrics")
+    return backend
+
+
+class BackendTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.backend = load_backend(directory.name)
+
+    def client(self, scores: list[int] = ()) -> TestClient:
+        self.backend.store.add_many(
+            [(i + 1, f"player{i}", score, None) for i, score in enumerate(scores)]
+        )
+        return self.enterContext(TestClient(self.backend.app))
+
+
+class LeaderboardPageTest(BackendTest):
+    def test_cursor_pages_through_tied_scores(self):
+        scores = [500, 300, 300, 300, 300, 300, 100, 100, 50]
+        client = self.client(scores)
+        names = []
+        url = "/get-leaderboard/?limit=2"
+        while True:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            names += [entry["name"] for entry in response.json()]
+            if "link" not in response.headers:
+                break
+            url = response.headers["link"].split(">")[0].removeprefix("<")
+        expected = sorted(range(len(scores)), key=lambda i: (-scores[i], i))
+        self.assertEqual(names, [f"player{i}" for i in expected])
+
+    def test_matching_etag_is_not_modified(self):
+        client = self.client([10, 20])
+        response = client.get("/get-leaderboard/")
+        etag = response.headers["etag"]
+        response = client.get("/get-leaderboard/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["etag"], etag)
+
+        client.post("/submit-score/", json={"name": "new", "score": 30})
+        response = client.get("/get-leaderboard/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["etag"], etag)
+        self.assertEqual(response.json()[0], {"name": "new", "score": 30})
+
+    def test_invalid_cursor_is_rejected_before_etag(self):
+        client = self.client([10])
+        etag = client.get("/get-leaderboard/").headers["etag"]
+        response = client.get(
+            "/get-leaderboard/",
+            params={"cursor": "bad"},
+            headers={"If-None-Match": etag},
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class SubmitScoresTest(BackendTest):
+    def test_repeated_batch_is_idempotent(self):
+        client = self.client([10, 20])
+        batch = {"scores": [{"id": "game-1", "name": "queued", "score": 40}]}
+        response = client.post("/submit-scores/", json=batch)
+        self.assertEqual(
+            response.json(), {"accepted": 1, "duplicates": 0, "rejected": 0}
+        )
+        board = client.get("/get-leaderboard/").json()
+        response = client.post("/submit-scores/", json=batch)
+        self.assertEqual(
+            response.json(), {"accepted": 0, "duplicates": 1, "rejected": 0}
+        )
+        self.assertEqual(client.get("/get-leaderboard/").json(), board)
+        self.assertEqual(board[0], {"name": "queued", "score": 40})
+        self.assertEqual(len(board), 3)
+
+
+class LeaderboardStatsTest(BackendTest):
+    def test_percentiles_match_exact_ranks(self):
+        rng = random.Random(5)
+        scores = [int(rng.lognormvariate(8, 2)) for _ in range(5000)] + [0] * 50
+        client = self.client(scores)
+        scores.sort()
+        gamma = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+        for score in [0, 1, 2, 100, 2048, 9999] + rng.sample(scores, 200):
+            rank = client.get(f"/rank/{score}").json()
+            self.assertEqual(
+                rank["rank"], len(scores) - bisect_right(scores, score) + 1
+            )
+            data = client.get(f"/percentile/{score}").json()
+            self.assertEqual(data["total"], len(scores))
+            low = bisect_left(scores, score / gamma) if score else 0
+            high = bisect_right(scores, score * gamma) if score else 0
+            self.assertGreaterEqual(data["percentile"], 100 * low / len(scores))
+            self.assertLessEqual(data["percentile"], 100 * high / len(scores))
+
+
+if __name__ == "__main__":
+    unittest.main()
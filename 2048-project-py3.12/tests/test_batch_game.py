@@ -0,0 +1,70 @@
+import random
+import unittest
+
+import numpy as np
+
+from batch_game import BatchGame
+from engine import DIRECTIONS, BitboardEngine
+
+GAMES = 64
+STEPS = 300
+
+
+def to_bitboard(cells: np.ndarray) -> int:
+    board = 0
+    for index, exponent in enumerate(cells.ravel()):
+        board |= int(exponent) << (4 * index)
+    return board
+
+
+class BatchGameTest(unittest.TestCase):
+    def test_steps_match_bitboard_engine(self):
+        batch = BatchGame(GAMES, seed=3)
+        batch.reset()
+        engines = [BitboardEngine(to_bitboard(cells)) for cells in batch.boards]
+        rng = random.Random(3)
+        for step in range(STEPS):
+            directions = [rng.choice(DIRECTIONS) for _ in range(GAMES)]
+            gained, changed = batch.move(directions)
+            for i, (engine, direction) in enumerate(zip(engines, directions)):
+                _, engine_gained, engine_changed = engine.move(direction)
+                message = f"game {i}, step {step}, {direction}"
+                self.assertEqual(to_bitboard(batch.boards[i]), engine.board, message)
+                self.assertEqual(gained[i], engine_gained, message)
+                self.assertEqual(changed[i], engine_changed, message)
+                self.assertEqual(batch.scores[i], engine.score, message)
+
+            batch.spawn(changed)
+            over = batch.game_over()
+            for i, engine in enumerate(engines):
+                engine.board = to_bitboard(batch.boards[i])
+                self.assertEqual(over[i], engine.is_game_over(), f"game {i}")
+            if over.any():
+                batch.reset(over)
+                for i in np.flatnonzero(over):
+                    engines[i] = BitboardEngine(to_bitboard(batch.boards[i]))
+
+    def test_max_tiles_do_not_keep_game_alive(self):
+        batch = BatchGame(2, seed=0)
+        batch.boards[0] = [[15, 15, 1, 2], [2, 1, 2, 1], [1, 2, 1, 2], [2, 1, 2, 1]]
+        batch.boards[1] = batch.boards[0]
+        batch.boards[1, 3, 3] = 2
+        for cells, over in zip(batch.boards, batch.game_over()):
+            self.assertEqual(over, BitboardEngine(to_bitboard(cells)).is_game_over())
+        self.assertEqual(list(batch.game_over()), [True, False])
+
+    def test_seeds_are_independent_of_batch(self):
+        seeds = np.arange(1, 9, dtype=np.uint64)
+        whole = BatchGame(8, seeds=seeds)
+        part = BatchGame(3, seeds=seeds[2:5])
+        whole.reset()
+        part.reset()
+        for direction in ["left", "up", "right", "down"] * 10:
+            whole.step(direction)
+            part.step(direction)
+        np.testing.assert_array_equal(whole.boards[2:5], part.boards)
+        np.testing.assert_array_equal(whole.scores[2:5], part.scores)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import random
+import unittest
+
+from engine import DIRECTIONS
+from game import Board, Game, Position, Tile
+
+SIZES = (3, 4, 5, 6, 8)
+GAMES = 4
+STEPS = 400
+
+
+def rescan(board: Board) -> tuple[int, int, bool]:
+    size = board.size
+    empty = 0
+    pairs = 0
+    for row in range(size):
+        for col in range(size):
+            tile = board.get_tile(Position(row, col))
+            if tile is None:
+                empty += 1
+                continue
+            for dy, dx in ((0, 1), (1, 0)):
+                if row + dy < size and col + dx < size:
+                    other = board.get_tile(Position(row + dy, col + dx))
+                    if other is not None and other.value == tile.value < 32768:
+                        pairs += 1
+    return empty, pairs, empty > 0 or pairs > 0
+
+
+class CheckedGame(Game):
+    def __init__(self, test: unittest.TestCase, **kwargs):
+        self.test = test
+        super().__init__(**kwargs)
+
+    def add_random_tile(self):
+        self.check("before spawn")
+        tile = super().add_random_tile()
+        self.check("after spawn")
+        return tile
+
+    def check(self, step: str) -> None:
+        board = self.board
+        board.check_consistency()
+        self.test.assertEqual(
+            (board.empty_count, board.mergeable_pairs, board.has_moves()),
+            rescan(board),
+            step,
+        )
+
+
+class BoardConsistencyTest(unittest.TestCase):
+    def play(self, size: int, seed: int) -> None:
+        rng = random.Random(seed)
+        game = CheckedGame(self, seed=seed, grid_size=size, win_tile=1 << 30)
+        for _ in range(STEPS):
+            action = rng.random()
+            if action < 0.1:
+                game.undo()
+                game.check("after undo")
+            elif action < 0.15:
+                game.redo()
+                game.check("after redo")
+            else:
+                game.process_movement(rng.choice(DIRECTIONS))
+                game.check("after move")
+            if game.is_game_over():
+                game.reset(rng.getrandbits(64))
+
+    def test_random_games(self):
+        for size in SIZES:
+            for seed in range(GAMES):
+                with self.subTest(size=size, seed=seed):
+                    self.play(size, seed)
+
+    def test_full_board_without_pairs_has_no_moves(self):
+        board = Board(2)
+        for (row, col), value in zip([(0, 0), (0, 1), (1, 0), (1, 1)], [2, 4, 4, 2]):
+            board.add_tile(Tile(value, row, col))
+        board.check_consistency()
+        self.assertEqual((board.empty_count, board.mergeable_pairs), (0, 0))
+        self.assertFalse(board.has_moves())
+        board.add_tile(Tile(4, 0, 0))
+        board.check_consistency()
+        self.assertEqual(board.mergeable_pairs, 2)
+        self.assertTrue(board.has_moves())
+
+    def test_max_tiles_are_not_mergeable(self):
+        board = Board(2)
+        for (row, col), value in zip([(0, 0), (0, 1), (1, 0), (1, 1)], [32768] * 4):
+            board.add_tile(Tile(value, row, col))
+        board.check_consistency()
+        self.assertEqual(board.mergeable_pairs, 0)
+        self.assertFalse(board.has_moves())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import random
+import unittest
+
+from engine import DIRECTIONS, BitboardEngine, move_board
+from game import Game
+
+BOARDS = 2000
+
+
+def random_board(rng: random.Random, low: int, high: int, caps: int = 0) -> int:
+    board = 0
+    for index in range(16):
+        if rng.random() < 0.3:
+            continue
+        board |= rng.randint(low, high) << (4 * index)
+    for index in rng.sample(range(16), caps):
+        board = board & ~(0xF << (4 * index)) | 15 << (4 * index)
+    return board
+
+
+def game_move(board: int, direction: str) -> tuple[int, int, bool]:
+    game = Game(seed=0)
+    game.load_bitboard(board, score=0)
+    moved = game.process_movement(direction)
+    if moved:
+        game.board.remove_tile(game.last_turn.spawned.pos)
+    return game.to_bitboard(), game.score, moved
+
+
+class BitboardEngineTest(unittest.TestCase):
+    def assert_matches_game(self, boards: list[int]) -> None:
+        for board in boards:
+            for direction in DIRECTIONS:
+                engine = BitboardEngine(board)
+                self.assertEqual(
+                    engine.move(direction),
+                    game_move(board, direction),
+                    f"{direction} on {board:#018x}",
+                )
+
+    def test_random_boards_match_game(self):
+        rng = random.Random(1)
+        self.assert_matches_game([random_board(rng, 1, 11) for _ in range(BOARDS)])
+
+    def test_merges_near_cap_match_game(self):
+        rng = random.Random(2)
+        self.assert_matches_game(
+            [random_board(rng, 12, 14, rng.randint(0, 6)) for _ in range(BOARDS)]
+        )
+
+    def test_max_tiles_do_not_merge(self):
+        board = 15 | 15 << 4
+        self.assertEqual(move_board(board, "left"), (board, 0))
+        self.assertEqual(move_board(board, "right"), (board << 8, 0))
+        self.assert_matches_game([board, board | 14 << 8 | 14 << 12, board * 0x10001])
+
+    def test_unchanged_move_keeps_score(self):
+        engine = BitboardEngine(1 | 2 << 4, score=10)
+        self.assertEqual(engine.move("left"), (1 | 2 << 4, 0, False))
+        self.assertEqual(engine.score, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
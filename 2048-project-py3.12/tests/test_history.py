@@ -0,0 +1,76 @@
+import random
+import unittest
+
+from engine import DIRECTIONS
+from game import Game
+from history import History
+
+
+def record(i: int) -> bytes:
+    return i.to_bytes(4, "little")
+
+
+class HistoryTest(unittest.TestCase):
+    def test_wraps_at_capacity(self):
+        history = History(4, max_bytes=12)
+        for i in range(10):
+            history.push(record(i))
+        self.assertEqual((len(history), history.dropped, history.nbytes), (3, 7, 12))
+        self.assertEqual(
+            [history.pop() for _ in range(3)], [record(i) for i in (9, 8, 7)]
+        )
+        self.assertEqual(len(history), 0)
+
+    def test_pop_empty_raises(self):
+        history = History(4, max_bytes=12)
+        with self.assertRaises(IndexError):
+            history.pop()
+        history.push(record(1))
+        history.pop()
+        with self.assertRaises(IndexError):
+            history.pop()
+
+    def test_push_after_wrap_and_pop(self):
+        history = History(4, max_bytes=12)
+        for i in range(5):
+            history.push(record(i))
+        self.assertEqual(history.pop(), record(4))
+        history.push(record(5))
+        history.push(record(6))
+        self.assertEqual(
+            [history.pop() for _ in range(3)], [record(i) for i in (6, 5, 3)]
+        )
+
+    def test_wrong_record_size_is_rejected(self):
+        with self.assertRaises(ValueError):
+            History(4).push(b"abc")
+
+
+class GameUndoTest(unittest.TestCase):
+    def test_undo_on_empty_history(self):
+        game = Game(seed=1)
+        state = game.pack_state()
+        self.assertFalse(game.undo())
+        self.assertEqual(game.pack_state(), state)
+        self.assertEqual(len(game.moves), 0)
+
+    def test_undo_after_wrap(self):
+        game = Game(seed=2)
+        game.history = History(game.state_size, max_bytes=3 * game.state_size)
+        rng = random.Random(2)
+        states = []
+        while len(states) < 10:
+            state = game.pack_state()
+            if game.process_movement(rng.choice(DIRECTIONS)):
+                states.append(state)
+        self.assertEqual(game.history.dropped, 7)
+        for state in reversed(states[-3:]):
+            self.assertTrue(game.undo())
+            self.assertEqual(game.pack_state(), state)
+        self.assertFalse(game.undo())
+        self.assertEqual(game.pack_state(), states[-3])
+        self.assertEqual(len(game.moves), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import base64
+import os
+import random
+import sys
+import unittest
+
+import engine
+from game import Game
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import replay  # noqa: E402
+from verifier import verify_replay  # noqa: E402
+
+SESSIONS = 20
+STEPS = 300
+
+
+def play(seed: int) -> Game:
+    rng = random.Random(seed)
+    game = Game(seed=seed)
+    for _ in range(STEPS):
+        action = rng.random()
+        if action < 0.1:
+            game.undo()
+        elif action < 0.15:
+            game.redo()
+        else:
+            game.process_movement(rng.choice(engine.DIRECTIONS))
+        if game.is_game_over():
+            break
+    return game
+
+
+def replay_args(game: Game) -> tuple[int, bytes, int]:
+    data = game.replay()
+    return data["seed"], base64.b64decode(data["moves"]), data["count"]
+
+
+class ReplayContractTest(unittest.TestCase):
+    def test_sessions_verify(self):
+        for seed in range(SESSIONS):
+            game = play(seed)
+            seed, moves, count = replay_args(game)
+            with self.subTest(seed=seed):
+                self.assertIsNone(verify_replay(seed, moves, count, game.score))
+
+    def test_altered_score_is_rejected(self):
+        for seed in range(SESSIONS):
+            game = play(seed)
+            with self.subTest(seed=seed):
+                self.assertIsNotNone(verify_replay(*replay_args(game), game.score + 2))
+
+    def test_altered_log_is_rejected(self):
+        for seed in range(SESSIONS):
+            game = play(seed)
+            seed, moves, count = replay_args(game)
+            log = list(engine.MoveLog(moves, count))
+            board = replay.ReplayEngine(seed)
+            last_scoring = 0
+            for i, move in enumerate(log):
+                score = board.score
+                board.move(engine.DIRECTIONS[move])
+                board.spawn()
+                if board.score > score:
+                    last_scoring = i
+            stuck = [
+                move
+                for move, direction in enumerate(engine.DIRECTIONS)
+                if replay.move_board(board.board, direction)[0] == board.board
+            ]
+            with self.subTest(seed=seed):
+                self.assertIsNotNone(
+                    verify_replay(seed, moves, last_scoring, game.score)
+                )
+                self.assertIsNotNone(
+                    verify_replay(seed, moves, len(moves) * 4 + 1, game.score)
+                )
+                if stuck:
+                    extended = engine.MoveLog(moves, count)
+                    extended.append(stuck[0])
+                    self.assertIsNotNone(
+                        verify_replay(seed, extended.to_bytes(), count + 1, game.score)
+                    )
+
+    def test_replay_engine_matches_client_engine(self):
+        rng = random.Random(4)
+        for _ in range(2000):
+            board = rng.getrandbits(64)
+            for direction in engine.DIRECTIONS:
+                self.assertEqual(
+                    replay.move_board(board, direction),
+                    engine.move_board(board, direction),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
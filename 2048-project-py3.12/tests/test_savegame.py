@@ -0,0 +1,107 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+import engine
+from game import SNAPSHOT, Game
+from savegame import SaveFile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from verifier import verify_replay  # noqa: E402
+
+STEPS = 40
+
+
+def play(game: Game, rng: random.Random, steps: int, undo: bool = True) -> None:
+    for _ in range(steps):
+        action = rng.random() if undo else 1.0
+        if action < 0.1:
+            game.undo()
+        elif action < 0.15:
+            game.redo()
+        else:
+            game.process_movement(rng.choice(engine.DIRECTIONS))
+        if game.is_game_over():
+            break
+
+
+def cells(game: Game) -> dict:
+    return {pos: tile.value for pos, tile in game.board.tiles.items()}
+
+
+class SnapshotTest(unittest.TestCase):
+    def played(self, seed: int) -> tuple[Game, random.Random]:
+        rng = random.Random(seed)
+        game = Game(seed=seed)
+        play(game, rng, STEPS)
+        return game, rng
+
+    def test_round_trip(self):
+        for seed in range(5):
+            game, _ = self.played(seed)
+            loaded = Game(seed=0)
+            loaded.load_snapshot(game.snapshot())
+            with self.subTest(seed=seed):
+                self.assertEqual(cells(loaded), cells(game))
+                self.assertEqual(loaded.score, game.score)
+                self.assertEqual(loaded.rng.draws, game.rng.draws)
+                self.assertEqual(loaded.rng.getstate(), game.rng.getstate())
+                self.assertEqual(loaded.replay(), game.replay())
+
+    def test_continued_game_verifies(self):
+        for seed in range(5):
+            game, rng = self.played(seed)
+            loaded = Game(seed=0)
+            loaded.load_snapshot(game.snapshot())
+            moves_seed = rng.getrandbits(32)
+            play(loaded, random.Random(moves_seed), 1000, undo=False)
+            play(game, random.Random(moves_seed), 1000, undo=False)
+            with self.subTest(seed=seed):
+                self.assertTrue(loaded.is_game_over())
+                self.assertEqual(cells(loaded), cells(game))
+                self.assertEqual(loaded.score, game.score)
+                self.assertIsNone(
+                    verify_replay(
+                        loaded.seed,
+                        loaded.moves.to_bytes(),
+                        len(loaded.moves),
+                        loaded.score,
+                    )
+                )
+
+    def test_save_file_round_trip(self):
+        game, _ = self.played(7)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "savegame.bin")
+            SaveFile(path).close(game.snapshot())
+            loaded = Game(seed=0)
+            loaded.load_snapshot(SaveFile(path).load())
+        self.assertEqual(cells(loaded), cells(game))
+        self.assertEqual(loaded.score, game.score)
+
+    def test_truncated_snapshot_is_rejected(self):
+        game, _ = self.played(3)
+        data = game.snapshot()
+        for size in (0, SNAPSHOT.size - 1, SNAPSHOT.size + 1, len(data) - 1):
+            with self.subTest(size=size):
+                with self.assertRaises(ValueError):
+                    Game(seed=0).load_snapshot(data[:size])
+
+    def test_corrupted_snapshot_is_rejected(self):
+        game, _ = self.played(3)
+        data = game.snapshot()
+        for index in (0, 3, 4):
+            corrupted = bytearray(data)
+            corrupted[index] ^= 0xFF
+            with self.subTest(index=index):
+                with self.assertRaises(ValueError):
+                    Game(seed=0).load_snapshot(bytes(corrupted))
+
+
+if __name__ == "__main__":
+    unittest.main()